@@ -0,0 +1,98 @@
+"""
+조건부 GET 처리
+ETag/Last-Modified 발급과 If-None-Match/If-Modified-Since 응답(304)
+"""
+from fastapi import Depends, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from typing import Optional
+import hashlib
+from app.api.deps import get_space
+from app.database import get_read_db
+from app.services.change_tracking import change_versions, response_cache
+
+
+class ConditionalGet:
+    """
+    조회 요청 하나의 캐시 검증 정보
+    - ETag: 공간 + 변경 버전 + 요청 경로/쿼리로 계산
+    - DB나 임베딩 모델을 건드리기 전에 304 또는 캐시된 응답을 결정
+    """
+    
+    def __init__(self, request: Request, db: Session, space: str):
+        self.request = request
+        self.version, self.updated_at = change_versions.current(db, space)
+        # 버전 조회 트랜잭션을 바로 끝내 연결을 풀에 반환
+        # (엔드포인트가 임베딩 대기 중에 연결을 잡고 있지 않도록)
+        db.rollback()
+        
+        target = f"{request.url.path}?{request.url.query}"
+        digest = hashlib.sha1(target.encode("utf-8")).hexdigest()[:16]
+        self.cache_key = f"{space}-{self.version}-{digest}"
+        self.etag = f'W/"{self.cache_key}"'
+    
+    @property
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.updated_at is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.updated_at.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+    
+    def _not_modified(self) -> bool:
+        """클라이언트가 가진 응답이 최신인지 확인"""
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any(
+                tag.removeprefix("W/") == self.etag.removeprefix("W/") for tag in tags
+            )
+        
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and self.updated_at is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.updated_at.replace(microsecond=0) <= since
+        
+        return False
+    
+    def cached_response(self) -> Optional[Response]:
+        """
+        계산 없이 보낼 수 있는 응답
+        
+        Returns:
+            304 응답, 공유 캐시에 있던 응답, 또는 None (새로 계산 필요)
+        """
+        if self._not_modified():
+            return Response(status_code=304, headers=self.headers)
+        
+        body = response_cache.get(self.cache_key)
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers=self.headers)
+        
+        return None
+    
+    def respond(self, model: BaseModel) -> Response:
+        """계산한 응답을 직렬화해 캐시에 저장하고 검증 헤더와 함께 반환"""
+        body = model.model_dump_json().encode("utf-8")
+        response_cache.set(self.cache_key, body)
+        return Response(content=body, media_type="application/json", headers=self.headers)
+
+
+def get_conditional(
+    request: Request,
+    space: str = Depends(get_space),
+    db: Session = Depends(get_read_db)
+) -> ConditionalGet:
+    """
+    조건부 GET 의존성
+    버전은 엔드포인트와 같은 읽기 세션(같은 DB)에서 조회
+    """
+    return ConditionalGet(request, db, space)
@@ -0,0 +1,22 @@
+"""
+API 공통 의존성
+"""
+from fastapi import Header
+from app.config import settings
+
+# 공간 이름은 인덱스 이름에도 쓰이므로 안전한 문자만 허용
+SPACE_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+def get_space(
+    x_space: str = Header(
+        settings.DEFAULT_SPACE,
+        pattern=SPACE_PATTERN,
+        description="메모 공간 (테넌트) 이름"
+    )
+) -> str:
+    """
+    요청 대상 메모 공간 의존성
+    X-Space 헤더가 없으면 기본 공간 사용
+    """
+    return x_space
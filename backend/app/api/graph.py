@@ -2,13 +2,20 @@
 그래프 시각화 API 엔드포인트
 메모 간 연결 그래프 데이터 제공
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import Optional
-from app.database import get_db
+from datetime import datetime
+from app.database import get_read_db
+from app.api.deps import get_space
+from app.api.conditional import ConditionalGet, get_conditional
 from app.schemas.graph import GraphResponse, GraphNode, GraphEdge
 from app.config import settings
+from app.services.filters import build_note_filters
+from app.services.layout import layout_service
+from app.services.linking import linking_service
+from app.services.vector_search import vector_search
 
 router = APIRouter(prefix="/api/graph", tags=["graph"])
 
@@ -17,7 +24,12 @@ router = APIRouter(prefix="/api/graph", tags=["graph"])
 async def get_graph(
     query: Optional[str] = Query(None, description="필터링할 쿼리 (없으면 전체 그래프)"),
     min_strength: float = Query(0.75, ge=0.0, le=1.0, description="최소 연결 강도"),
-    db: Session = Depends(get_db)
+    since: Optional[datetime] = Query(None, description="이 시각 이후 생성된 메모만 (포함)"),
+    until: Optional[datetime] = Query(None, description="이 시각 이전 생성된 메모만 (미포함)"),
+    layout: bool = Query(False, description="서버에서 계산한 노드 좌표(x, y) 포함 여부"),
+    space: str = Depends(get_space),
+    conditional: ConditionalGet = Depends(get_conditional),
+    db: Session = Depends(get_read_db)
 ):
     """
     연결 그래프 데이터 반환
@@ -25,8 +37,22 @@ async def get_graph(
     특징:
     - 전체 연결이 아닌 신뢰도 높은 연결만 (기본 0.75 이상)
     - query가 있으면 관련 메모 중심으로 서브그래프 반환
+    - since/until로 기간을 지정하면 해당 기간의 메모만 노드로 사용
+    - X-Space 헤더의 메모 공간 안에서만 조회
+    - layout=true면 노드 좌표를 서버에서 계산해 함께 반환 (그래프 버전별 캐싱)
+    - ETag/Last-Modified 발급, 변경이 없으면 계산 없이 304 반환
     - 사용자는 편집 불가, 관찰만 가능
     """
+    cached = conditional.cached_response()
+    if cached is not None:
+        return cached
+    
+    window_sql, window_params = build_note_filters(
+        space=space, since=since, until=until
+    )
+    n_window_sql, _ = build_note_filters(
+        alias="n", space=space, since=since, until=until
+    )
     
     if query:
         # 쿼리 관련 서브그래프
@@ -35,49 +61,67 @@ async def get_graph(
         query_embedding = await embedding_service.get_embedding(query)
         
         # 2. 상위 20개 유사 메모
-        similar_query = text("""
+        # (기간 조건이 있으면 HNSW 후보에 조건을 나중에 적용하지 않도록 검색 방식 결정)
+        scan = vector_search.candidate_scan(db, window_sql, window_params, 20)
+        similar_query = text(f"""
+            WITH candidates AS {scan} (
+                SELECT id, content, created_at, embedding
+                FROM notes
+                WHERE embedding IS NOT NULL{window_sql}
+            )
             SELECT id, content, created_at
-            FROM notes
-            WHERE embedding IS NOT NULL
+            FROM candidates
             ORDER BY embedding <=> :embedding
             LIMIT 20
         """)
         
-        result = db.execute(similar_query, {"embedding": str(query_embedding)})
+        result = db.execute(
+            similar_query,
+            {"embedding": str(query_embedding), **window_params}
+        )
         note_ids = [row.id for row in result.fetchall()]
         
         if not note_ids:
-            return GraphResponse(nodes=[], edges=[])
+            return conditional.respond(GraphResponse(nodes=[], edges=[]))
         
-        # 3. 해당 메모들과 연결된 메모 포함
-        nodes_query = text("""
+        # 3. 해당 메모들의 연결된 이웃 포함 (엣지와 같은 memory_links, 연결 수 제한 적용분)
+        nodes_query = text(f"""
             SELECT DISTINCT n.id, n.content, n.created_at
             FROM notes n
-            WHERE n.id = ANY(:note_ids)
+            WHERE (
+                n.id = ANY(:note_ids)
                 OR n.id IN (
-                    SELECT target_note_id FROM memory_links 
-                    WHERE source_note_id = ANY(:note_ids) AND strength >= :min_strength
+                    SELECT target_note_id
+                    FROM memory_links
+                    WHERE source_note_id = ANY(:note_ids)
+                        AND strength >= :min_strength
                 )
+            ){n_window_sql}
             ORDER BY n.created_at DESC
             LIMIT 50
         """)
         
         result = db.execute(
             nodes_query, 
-            {"note_ids": note_ids, "min_strength": min_strength}
+            {
+                "note_ids": note_ids,
+                "min_strength": min_strength,
+                **window_params
+            }
         )
         nodes_data = result.fetchall()
         
     else:
         # 전체 그래프 (최근 50개 메모)
-        nodes_query = text("""
+        nodes_query = text(f"""
             SELECT id, content, created_at
             FROM notes
+            WHERE TRUE{window_sql}
             ORDER BY created_at DESC
             LIMIT 50
         """)
         
-        result = db.execute(nodes_query)
+        result = db.execute(nodes_query, window_params)
         nodes_data = result.fetchall()
     
     # 노드 구성
@@ -93,7 +137,7 @@ async def get_graph(
     node_ids = [node.id for node in nodes]
     
     if not node_ids:
-        return GraphResponse(nodes=[], edges=[])
+        return conditional.respond(GraphResponse(nodes=[], edges=[]))
     
     # 엣지 조회 (해당 노드들 간의 연결만)
     edges_query = text("""
@@ -120,4 +164,77 @@ async def get_graph(
         for row in result.fetchall()
     ]
     
-    return GraphResponse(nodes=nodes, edges=edges)
+    # 노드 좌표 계산 (요청 시)
+    if layout:
+        positions = layout_service.compute(db, space, node_ids, edges)
+        for node in nodes:
+            node.x, node.y = positions[node.id]
+    
+    return conditional.respond(GraphResponse(nodes=nodes, edges=edges))
+
+
+@router.get("/neighborhood", response_model=GraphResponse)
+async def get_neighborhood(
+    note_id: Optional[int] = Query(None, description="시작 메모 ID"),
+    query: Optional[str] = Query(None, description="시작 메모를 찾을 질문 (note_id가 없을 때)"),
+    depth: int = Query(2, ge=1, le=4, description="최대 확장 단계 수"),
+    fan_out: int = Query(5, ge=1, le=20, description="단계마다 노드당 따라갈 최대 연결 수"),
+    min_strength: float = Query(0.75, ge=0.0, le=1.0, description="최소 연결 강도"),
+    max_nodes: int = Query(200, ge=1, le=1000, description="최대 노드 수"),
+    space: str = Depends(get_space),
+    conditional: ConditionalGet = Depends(get_conditional),
+    db: Session = Depends(get_read_db)
+):
+    """
+    k-hop 이웃 그래프 반환
+    
+    특징:
+    - 시작 메모(또는 질문과 유사한 메모들)에서 depth 단계까지 연결을 따라 확장
+    - 단일 재귀 쿼리로 처리 (단계별 반복 조회 없음)
+    - 노드마다 시작점으로부터의 단계 수(depth) 포함
+    - ETag/Last-Modified 발급, 변경이 없으면 계산 없이 304 반환
+    """
+    if note_id is None and not query:
+        raise HTTPException(status_code=400, detail="note_id 또는 query가 필요합니다")
+    
+    cached = conditional.cached_response()
+    if cached is not None:
+        return cached
+    
+    query_embedding = None
+    if note_id is None:
+        from app.services.embedding import embedding_service
+        query_embedding = await embedding_service.get_embedding(query)
+    
+    nodes_data, edges_data = await linking_service.get_neighborhood(
+        db,
+        space,
+        note_id=note_id,
+        query_embedding=query_embedding,
+        depth=depth,
+        fan_out=fan_out,
+        min_strength=min_strength,
+        max_nodes=max_nodes
+    )
+    
+    nodes = [
+        GraphNode(
+            id=node["id"],
+            content=node["content"],
+            created_at=node["created_at"],
+            depth=node["depth"]
+        )
+        for node in nodes_data
+    ]
+    
+    edges = [
+        GraphEdge(
+            source=edge["source"],
+            target=edge["target"],
+            strength=edge["strength"],
+            reason=edge["reason"]
+        )
+        for edge in edges_data
+    ]
+    
+    return conditional.respond(GraphResponse(nodes=nodes, edges=edges))
@@ -1,51 +1,148 @@
 """
 메모 API 엔드포인트
-메모의 생성, 조회 처리
+메모의 생성, 조회, 수정, 삭제 처리
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteResponse, RelatedNote
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+import time
+from app.database import get_db, get_read_db, LAST_WRITE_HEADER
+from app.api.deps import get_space
+from app.api.conditional import ConditionalGet, get_conditional
+from app.models.note import Note, compute_content_hash
+from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse, RelatedNote
 from app.services.embedding import embedding_service
+from app.services.admission import PRIORITY_BULK
 from app.services.linking import linking_service
+from app.services.neighbors import neighbor_service
+from app.services.layout import layout_service
+from app.services.change_tracking import change_versions
 
 router = APIRouter(prefix="/api/notes", tags=["notes"])
 
 
+async def _build_note_response(db: Session, note: Note) -> NoteResponse:
+    """메모와 연결된 메모 정보로 응답 구성"""
+    related = await linking_service.get_related_notes(db, note.id)
+    
+    related_notes = [
+        RelatedNote(
+            id=r["id"],
+            content=r["content"],
+            strength=r["strength"],
+            created_at=r["created_at"]
+        )
+        for r in related
+    ]
+    
+    return NoteResponse(
+        id=note.id,
+        content=note.content,
+        created_at=note.created_at,
+        related_notes=related_notes
+    )
+
+
+def _find_existing_note(
+    db: Session,
+    space: str,
+    content_hash: str,
+    idempotency_key: Optional[str]
+) -> Optional[Note]:
+    """
+    이미 저장된 동일 요청/동일 내용 메모 조회
+    1. 같은 Idempotency-Key로 생성된 메모 (내용이 다르면 422)
+    2. 내용 해시가 같은 메모 (임베딩/연결까지 끝난 메모만)
+    """
+    if idempotency_key:
+        note = (
+            db.query(Note)
+            .filter(Note.space == space, Note.idempotency_key == idempotency_key)
+            .first()
+        )
+        if note:
+            if note.content_hash != content_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail="같은 Idempotency-Key가 다른 내용의 요청에 이미 사용되었습니다"
+                )
+            return note
+    
+    return (
+        db.query(Note)
+        .filter(
+            Note.space == space,
+            Note.content_hash == content_hash,
+            Note.embedding.isnot(None)
+        )
+        .order_by(Note.id)
+        .first()
+    )
+
+
 @router.post("", response_model=NoteResponse, status_code=201)
 async def create_note(
     note_data: NoteCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        max_length=128,
+        description="재시도 시 같은 메모가 중복 생성되지 않도록 하는 키"
+    ),
+    space: str = Depends(get_space),
     db: Session = Depends(get_db)
 ):
     """
     메모 생성 API
     
     처리 흐름:
-    1. 원문 저장
-    2. 임베딩 생성
-    3. 기존 메모들과 유사도 계산
-    4. 임계값 이상인 메모와 자동 연결 생성
-    5. 연결된 메모 정보와 함께 반환
+    0. 같은 Idempotency-Key 또는 같은 내용의 메모가 있으면 그 메모를 반환 (200)
+       (같은 키를 다른 내용에 다시 쓰면 422)
+    1. 임베딩 생성
+    2. 한 SQL 문장으로 원문+임베딩 저장, 같은 공간의 유사 메모 검색, 이웃 목록 갱신,
+       메모별 최대 연결 수를 지킨 자동 연결 생성, 공간 버전 증가
+    3. 한 번 커밋 후 그 문장이 반환한 연결된 메모 정보와 함께 반환 (조회 API와 같은 집합)
     """
-    # 1. 메모 생성
-    new_note = Note(content=note_data.content)
-    db.add(new_note)
-    db.commit()
-    db.refresh(new_note)
+    # 0. 중복 요청 확인 (모델/벡터 인덱스를 거치지 않음)
+    content_hash = compute_content_hash(note_data.content)
+    existing = _find_existing_note(db, space, content_hash, idempotency_key)
+    if existing:
+        response.status_code = 200
+        return await _build_note_response(db, existing)
     
-    # 2. 임베딩 생성
-    embedding = await embedding_service.get_embedding(note_data.content)
-    new_note.embedding = embedding
-    db.commit()
+    # 임베딩 대기(수용 제어 대기열 + 모델 실행) 중에는 DB 연결을 잡지 않도록 반환
+    db.rollback()
     
-    # 3. 자동 연결 생성
-    await linking_service.create_links(db, new_note)
+    # 1. 임베딩 생성
+    embedding = await embedding_service.get_embedding(
+        note_data.content, priority=PRIORITY_BULK
+    )
+    
+    # 2. 메모 저장 + 자동 연결 생성
+    try:
+        note, related = await linking_service.create_note_with_links(
+            db,
+            space,
+            note_data.content,
+            embedding,
+            content_hash=content_hash,
+            idempotency_key=idempotency_key
+        )
+        db.commit()
+    except IntegrityError:
+        # 같은 Idempotency-Key 요청이 동시에 들어온 경우 먼저 저장된 메모 반환
+        db.rollback()
+        existing = _find_existing_note(db, space, content_hash, idempotency_key)
+        if not existing:
+            raise
+        response.status_code = 200
+        return await _build_note_response(db, existing)
     
-    # 4. 연결된 메모 조회
-    related = await linking_service.get_related_notes(db, new_note.id)
+    change_versions.invalidate(space)
+    response.headers[LAST_WRITE_HEADER] = str(time.time())
     
-    # 5. 응답 구성
+    # 3. 응답 구성
     related_notes = [
         RelatedNote(
             id=r["id"],
@@ -57,9 +154,9 @@ async def create_note(
     ]
     
     return NoteResponse(
-        id=new_note.id,
-        content=new_note.content,
-        created_at=new_note.created_at,
+        id=note["id"],
+        content=note["content"],
+        created_at=note["created_at"],
         related_notes=related_notes
     )
 
@@ -67,32 +164,124 @@ async def create_note(
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: int,
-    db: Session = Depends(get_db)
+    space: str = Depends(get_space),
+    conditional: ConditionalGet = Depends(get_conditional),
+    db: Session = Depends(get_read_db)
 ):
     """
     메모 조회 API
+    다른 공간의 메모는 존재하지 않는 것으로 취급
+    ETag/Last-Modified 발급, 공간에 변경이 없으면 DB 조회 없이 304 반환
     """
-    note = db.query(Note).filter(Note.id == note_id).first()
+    cached = conditional.cached_response()
+    if cached is not None:
+        return cached
+    
+    note = (
+        db.query(Note)
+        .filter(Note.id == note_id, Note.space == space)
+        .first()
+    )
     
     if not note:
         raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다")
     
-    # 연결된 메모 조회
-    related = await linking_service.get_related_notes(db, note.id)
+    return conditional.respond(await _build_note_response(db, note))
+
+
+@router.put("/{note_id}", response_model=NoteResponse)
+async def update_note(
+    note_id: int,
+    note_data: NoteUpdate,
+    response: Response,
+    space: str = Depends(get_space),
+    db: Session = Depends(get_db)
+):
+    """
+    메모 수정 API
     
-    related_notes = [
-        RelatedNote(
-            id=r["id"],
-            content=r["content"],
-            strength=r["strength"],
-            created_at=r["created_at"]
+    처리 흐름:
+    1. 내용이 바뀌지 않았으면 그대로 반환 (임베딩/연결 재계산 없음)
+    2. 새 내용으로 임베딩 재생성
+    3. 이 메모의 이웃 목록을 다시 계산하고, 이 메모가 들어 있는 다른 목록의 항목은
+       새 임베딩 기준으로 갱신 후 다시 순위를 매겨 top-k만 남김
+    4. 바뀐 목록 주변의 연결만 추가/삭제 (목록에서 파생)
+    5. 한 트랜잭션으로 커밋 후 이 메모의 파생 상태(레이아웃 좌표)만 무효화
+    """
+    note = (
+        db.query(Note)
+        .filter(Note.id == note_id, Note.space == space)
+        .first()
+    )
+    
+    if not note:
+        raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다")
+    
+    if note_data.content != note.content:
+        # 임베딩 대기(수용 제어 대기열 + 모델 실행) 중에는 DB 연결을 잡지 않도록 반환
+        db.rollback()
+        embedding = await embedding_service.get_embedding(
+            note_data.content, priority=PRIORITY_BULK
         )
-        for r in related
-    ]
+        
+        # 대기 중 삭제되었을 수 있으므로 다시 조회
+        note = (
+            db.query(Note)
+            .filter(Note.id == note_id, Note.space == space)
+            .first()
+        )
+        if not note:
+            raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다")
+        
+        note.content = note_data.content
+        note.content_hash = compute_content_hash(note_data.content)
+        note.embedding = embedding
+        db.flush()
     
-    return NoteResponse(
-        id=note.id,
-        content=note.content,
-        created_at=note.created_at,
-        related_notes=related_notes
+        neighbor_service.rebuild(db, [note.id])
+        dependents = neighbor_service.update_entries(db, note.id)
+        neighbor_service.add_to_neighbor_lists(db, note.id)
+        neighbor_service.sync_links(db, [note.id] + dependents)
+        change_versions.bump(db, space)
+        db.commit()
+        db.refresh(note)
+        
+        change_versions.invalidate(space)
+        layout_service.forget(space, [note.id])
+        response.headers[LAST_WRITE_HEADER] = str(time.time())
+    
+    return await _build_note_response(db, note)
+
+
+@router.delete("/{note_id}", status_code=204)
+async def delete_note(
+    note_id: int,
+    space: str = Depends(get_space),
+    db: Session = Depends(get_db)
+):
+    """
+    메모 삭제 API
+    연결(memory_links)과 이웃 목록 항목(note_neighbors)은 외래 키 CASCADE로 함께 삭제됨
+    이 메모가 빠진 목록 주변의 연결은 남은 목록 기준으로 다시 맞춤
+    """
+    dependents = neighbor_service.lists_containing(db, note_id)
+    deleted = (
+        db.query(Note)
+        .filter(Note.id == note_id, Note.space == space)
+        .delete(synchronize_session=False)
+    )
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다")
+    
+    neighbor_service.sync_links(db, dependents)
+    change_versions.bump(db, space)
+    db.commit()
+    
+    change_versions.invalidate(space)
+    layout_service.forget(space, [note_id])
+    
+    return Response(
+        status_code=204,
+        headers={LAST_WRITE_HEADER: str(time.time())}
     )
@@ -4,8 +4,16 @@
 """
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.recall import RecallRequest, RecallResponse, MemoryCluster, RecalledNote
+from app.database import get_read_db
+from app.api.deps import get_space
+from app.schemas.recall import (
+    RecallRequest,
+    RecallResponse,
+    RecallBatchRequest,
+    RecallBatchResponse,
+    MemoryCluster,
+    RecalledNote
+)
 from app.services.recall import recall_service
 
 router = APIRouter(prefix="/api/recall", tags=["recall"])
@@ -14,7 +22,8 @@ router = APIRouter(prefix="/api/recall", tags=["recall"])
 @router.post("", response_model=RecallResponse)
 async def recall_memories(
     request: RecallRequest,
-    db: Session = Depends(get_db)
+    space: str = Depends(get_space),
+    db: Session = Depends(get_read_db)
 ):
     """
     재등장 API
@@ -23,15 +32,53 @@ async def recall_memories(
     - 의미 유사도 + 시간 가중치 적용
     - 연결된 메모를 맥락 묶음으로 반환
     - 오래된 메모라도 의미가 강하면 노출
+    - mode=hybrid면 이름/코드 같은 정확한 키워드도 함께 반영
     """
     # 재등장 실행
     clusters = await recall_service.recall(
         db=db,
         query=request.query,
-        limit=request.limit
+        limit=request.limit,
+        space=space,
+        since=request.since,
+        until=request.until,
+        mode=request.mode
     )
     
-    # 응답 구성
+    return _build_recall_response(clusters)
+
+
+@router.post("/batch", response_model=RecallBatchResponse)
+async def recall_memories_batch(
+    request: RecallBatchRequest,
+    space: str = Depends(get_space),
+    db: Session = Depends(get_read_db)
+):
+    """
+    다중 질문 재등장 API
+    
+    에이전트처럼 한 번에 여러 질문을 보내는 경우:
+    - 임베딩은 한 번의 배치로, 후보 검색과 연결 조회는 각각 한 번의 쿼리로 처리
+    - 질문 순서대로 재등장 결과 반환 (질문당 /api/recall과 같은 형식)
+    - 질문별로 가장 가까운 limit × RECALL_BATCH_CANDIDATE_MULTIPLIER개 메모만 점수를 계산하므로
+      의미가 약한 오래된 메모는 /api/recall(기본: 전체 점수 계산)과 달리 순위에 오르지 않을 수 있음
+    """
+    clusters_by_query = await recall_service.recall_batch(
+        db=db,
+        queries=request.queries,
+        limit=request.limit,
+        space=space,
+        since=request.since,
+        until=request.until
+    )
+    
+    return RecallBatchResponse(
+        results=[_build_recall_response(clusters) for clusters in clusters_by_query]
+    )
+
+
+def _build_recall_response(clusters) -> RecallResponse:
+    """클러스터 리스트로 재등장 응답 구성"""
     recalled_memories = []
     for cluster in clusters:
         memory_cluster = MemoryCluster(
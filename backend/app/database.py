@@ -1,24 +1,111 @@
 """
 데이터베이스 연결 및 세션 관리
 """
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import List, Optional
+import itertools
+import threading
+import time
 from app.config import settings
 
 # SQLAlchemy 엔진 생성
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # 연결 유효성 확인
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     echo=False  # SQL 쿼리 로깅 (개발 시 True로 변경 가능)
 )
 
+# 연결 풀이 동시에 내줄 수 있는 최대 연결 수
+POOL_CAPACITY = settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW
+
 # 세션 팩토리
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # 모델 베이스 클래스
 Base = declarative_base()
 
+# 쓰기 응답에 붙는 마지막 쓰기 시각 헤더 (read-your-writes용)
+LAST_WRITE_HEADER = "X-Last-Write-At"
+
+
+class ReadReplica:
+    """읽기 전용 복제본 하나의 엔진과 상태"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(
+            url,
+            pool_pre_ping=True,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            echo=False
+        )
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReadReplicaRouter:
+    """
+    읽기 요청 분배기
+    - 복제본을 라운드 로빈으로 선택
+    - check_seconds마다 SELECT 1로 상태 확인, 실패한 복제본은 다음 확인까지 제외
+    - 사용할 복제본이 없으면 None (호출 측에서 주 DB 사용)
+    """
+
+    def __init__(self, urls: List[str], check_seconds: float):
+        self.replicas = [ReadReplica(url) for url in urls]
+        self.check_seconds = check_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, replica: ReadReplica) -> bool:
+        now = time.monotonic()
+        if now - replica.checked_at < self.check_seconds:
+            return replica.healthy
+
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except SQLAlchemyError:
+            healthy = False
+
+        replica.healthy = healthy
+        replica.checked_at = now
+        return healthy
+
+    def get_session(self) -> Optional[Session]:
+        """다음 정상 복제본의 세션 (없으면 None)"""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if self._is_healthy(replica):
+                return replica.session_factory()
+        return None
+
+    def stats(self) -> List[dict]:
+        """관측용 복제본 상태"""
+        return [
+            {"url": replica.engine.url.render_as_string(hide_password=True), "healthy": replica.healthy}
+            for replica in self.replicas
+        ]
+
+
+# 읽기 복제본 분배기 (READ_REPLICA_URLS가 비어 있으면 복제본 없음)
+replica_router = ReadReplicaRouter(
+    settings.read_replica_urls_list,
+    settings.READ_REPLICA_CHECK_SECONDS
+)
+
 
 def get_db():
     """
@@ -30,3 +117,31 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _wrote_recently(request: Request) -> bool:
+    """클라이언트가 방금 쓰기를 했는지 (X-Last-Write-At 헤더 기준)"""
+    last_write = request.headers.get(LAST_WRITE_HEADER)
+    if not last_write:
+        return False
+    try:
+        return time.time() - float(last_write) < settings.READ_YOUR_WRITES_SECONDS
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request):
+    """
+    읽기 전용 데이터베이스 세션 의존성
+    - 복제본이 있으면 라운드 로빈으로 복제본 사용
+    - 최근 쓰기를 한 클라이언트(read-your-writes)나 복제본 장애 시 주 DB 사용
+    """
+    db = None
+    if replica_router.replicas and not _wrote_recently(request):
+        db = replica_router.get_session()
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,16 +1,49 @@
 """
 FastAPI 메인 애플리케이션
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
+from app.database import replica_router, LAST_WRITE_HEADER, POOL_CAPACITY
 from app.api import notes, recall, graph
+from app.services.admission import AdmissionRejected, embedding_admission
+from app.services.background import background_jobs
+from app.services.embedding import embedding_service
+from app.services.profiling import request_profiler, PROFILE_ID_HEADER
+import asyncio
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작 시 설정 확인, 임베딩 캐시 예열과 백그라운드 작업 시작, 종료 시 중단"""
+    # 수용 제어가 받아들인 요청이 모두 DB 연결을 잡아도 풀이 바닥나지 않아야 함
+    # (풀이 바닥나면 동기 checkout이 pool_timeout 동안 이벤트 루프 전체를 막음)
+    if embedding_admission.capacity >= POOL_CAPACITY:
+        raise RuntimeError(
+            f"임베딩 동시 실행 수 + 대기열 합계({embedding_admission.capacity})가 "
+            f"DB 연결 풀 크기({POOL_CAPACITY})보다 작아야 합니다 "
+            "(EMBEDDING_MAX_* 또는 DATABASE_POOL_SIZE/DATABASE_MAX_OVERFLOW 조정)"
+        )
+    if settings.SNAPSHOT_WARM_START_PATH:
+        loaded = await asyncio.to_thread(
+            embedding_service.warm_start, settings.SNAPSHOT_WARM_START_PATH
+        )
+        print(f"스냅샷에서 임베딩 {loaded}개 캐시 예열 완료")
+    for job in background_jobs:
+        job.start()
+    yield
+    for job in background_jobs:
+        await job.stop()
+
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="인지 확장 앱 API",
     description="LLM 기반 장기 인지 확장 장치 - 메모를 던지고, 재등장시키는 시스템",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -20,8 +53,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Retry-After", LAST_WRITE_HEADER, PROFILE_ID_HEADER],
 )
 
+
+async def profiling_middleware(request: Request, call_next):
+    """
+    선택된 요청만 프로파일링 (X-Profile 헤더 또는 표본 비율, 기본 꺼짐)
+    결과는 PROFILE_DIR에 저장되고 응답의 X-Profile-Id로 파일 이름을 알려줌
+    """
+    if not request_profiler.should_profile(request):
+        return await call_next(request)
+    return await request_profiler.profile(request, call_next)
+
+
+# 프로파일링이 꺼져 있으면(기본) 요청마다 거치는 미들웨어 래퍼 자체를 두지 않음
+if request_profiler.enabled:
+    app.middleware("http")(profiling_middleware)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """수용 제어로 거절된 요청은 빠르게 429/503 + Retry-After로 응답"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # API 라우터 등록
 app.include_router(notes.router)
 app.include_router(recall.router)
@@ -44,5 +104,8 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "connected",
-        "embedding_model": settings.EMBEDDING_MODEL
+        "embedding_model": settings.EMBEDDING_MODEL,
+        "embedding_admission": embedding_admission.stats(),
+        "read_replicas": replica_router.stats(),
+        "background_jobs": [job.stats() for job in background_jobs]
     }
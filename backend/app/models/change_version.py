@@ -0,0 +1,27 @@
+"""
+ChangeVersion (변경 버전) 모델
+메모 공간별로 메모/연결이 바뀔 때마다 증가하는 버전
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChangeVersion(Base):
+    """
+    공간별 변경 버전 모델
+    - 메모 생성/수정/삭제, 연결 변경과 같은 트랜잭션에서 증가
+    - 조회 API의 ETag/Last-Modified 계산에 사용
+    """
+    __tablename__ = "change_versions"
+    
+    space = Column(String(64), primary_key=True)  # 메모 공간
+    version = Column(BigInteger, nullable=False, default=0)  # 변경 횟수
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )  # 마지막 변경 시각
+    
+    def __repr__(self):
+        return f"<ChangeVersion(space={self.space}, version={self.version})>"
@@ -2,11 +2,21 @@
 Note (메모) 모델
 사용자가 자유롭게 던지는 메모를 저장
 """
-from sqlalchemy import Column, Integer, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 from app.database import Base
 from app.config import settings
+import hashlib
+
+# 전문 검색 설정 (한국어 사전이 없으므로 형태소 분석 없이 공백 단위 토큰 사용)
+TEXT_SEARCH_CONFIG = "simple"
+
+
+def compute_content_hash(content: str) -> str:
+    """메모 내용의 SHA-256 해시 (중복 메모 판별용)"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
 class Note(Base):
@@ -16,18 +26,66 @@ class Note(Base):
     - 태그/폴더 없음 (의미 기반 연결만 사용)
     """
     __tablename__ = "notes"
+    __table_args__ = (
+        # 공간별 기간 조회(since/until)와 최신순 정렬이 전체 테이블을 훑지 않도록
+        Index("ix_notes_space_created_at", "space", "created_at"),
+        # 조건이 붙은 벡터 검색 전 행 수 확인을 인덱스만으로 처리 (임베딩 있는 행만)
+        Index(
+            "ix_notes_space_created_at_embedded",
+            "space",
+            "created_at",
+            postgresql_where=text("embedding IS NOT NULL")
+        ),
+        # 코사인 거리 기반 근사 최근접 이웃(ANN) 검색용 벡터 인덱스
+        Index(
+            "ix_notes_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        # 키워드(이름, 에러 코드 등) 전문 검색용 역색인
+        Index("ix_notes_content_tsv", "content_tsv", postgresql_using="gin"),
+        # 이웃 목록 재계산 대상(NULL/오래된 순) 조회
+        Index("ix_notes_neighbors_updated_at", "neighbors_updated_at"),
+        # 같은 내용 재전송 시 임베딩/연결 계산 없이 기존 메모를 찾기 위한 인덱스
+        Index("ix_notes_space_content_hash", "space", "content_hash"),
+        # 재시도 요청 식별 (같은 공간에서 키는 한 번만 사용)
+        Index(
+            "ux_notes_space_idempotency_key",
+            "space",
+            "idempotency_key",
+            unique=True
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
+    space = Column(
+        String(64),
+        nullable=False,
+        default=settings.DEFAULT_SPACE,
+        server_default=settings.DEFAULT_SPACE
+    )  # 메모 공간 (테넌트)
     content = Column(Text, nullable=False)  # 메모 원문
+    content_hash = Column(String(64), nullable=True)  # 원문 SHA-256 (중복 판별)
+    idempotency_key = Column(String(128), nullable=True)  # 생성 요청의 Idempotency-Key
     created_at = Column(
         DateTime(timezone=True), 
         server_default=func.now(),
         nullable=False
     )  # 생성 시각
+    neighbors_updated_at = Column(
+        DateTime(timezone=True),
+        nullable=True
+    )  # 이웃 목록 계산 시각 (NULL이면 다시 계산 필요)
     embedding = Column(
         Vector(settings.EMBEDDING_DIMENSION), 
         nullable=True
     )  # 임베딩 벡터 (384차원)
+    content_tsv = Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', content)", persisted=True)
+    )  # 전문 검색 벡터 (저장 시 DB가 자동 계산)
     
     def __repr__(self):
         preview = self.content[:50] + "..." if len(self.content) > 50 else self.content
@@ -0,0 +1,32 @@
+"""
+NoteNeighbor (이웃 메모) 모델
+메모별로 미리 계산해 둔 의미상 가장 가까운 메모 목록
+"""
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.database import Base
+
+
+class NoteNeighbor(Base):
+    """
+    메모별 top-k 이웃 모델
+    - 새 메모 저장 시 점진적으로 갱신 (기존 메모 목록의 하위 항목을 밀어낼 수 있음)
+    - 수정 시 이 메모가 들어 있는 목록의 항목만 새 임베딩 기준으로 갱신
+    - 연결(memory_links)은 이 목록에서 파생되므로 조회 시 ANN 검색이 필요 없음
+    """
+    __tablename__ = "note_neighbors"
+    
+    note_id = Column(
+        Integer,
+        ForeignKey("notes.id", ondelete="CASCADE"),
+        primary_key=True
+    )  # 기준 메모
+    neighbor_id = Column(
+        Integer,
+        ForeignKey("notes.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True
+    )  # 이웃 메모
+    similarity = Column(Float, nullable=False)  # 코사인 유사도
+    
+    def __repr__(self):
+        return f"<NoteNeighbor(note={self.note_id}, neighbor={self.neighbor_id}, similarity={self.similarity:.2f})>"
@@ -3,7 +3,7 @@ Graph (그래프 시각화) 관련 Pydantic 스키마
 """
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 
 class GraphNode(BaseModel):
@@ -11,6 +11,9 @@ class GraphNode(BaseModel):
     id: int
     content: str
     created_at: datetime
+    x: Optional[float] = None  # 서버 계산 레이아웃 좌표 (0.0 ~ 1.0, layout=true일 때)
+    y: Optional[float] = None
+    depth: Optional[int] = None  # 이웃 탐색 시 시작 메모로부터의 단계 수
     
     class Config:
         from_attributes = True
@@ -11,6 +11,11 @@ class NoteCreate(BaseModel):
     content: str = Field(..., min_length=1, description="메모 내용")
 
 
+class NoteUpdate(BaseModel):
+    """메모 수정 요청"""
+    content: str = Field(..., min_length=1, description="수정할 메모 내용")
+
+
 class RelatedNote(BaseModel):
     """연결된 메모 정보"""
     id: int
@@ -3,13 +3,19 @@ Recall (재등장) 관련 Pydantic 스키마
 """
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import Annotated, List, Literal, Optional
 
 
 class RecallRequest(BaseModel):
     """재등장 요청"""
     query: str = Field(..., min_length=1, description="질문 또는 사고 내용")
     limit: int = Field(10, ge=1, le=50, description="최대 반환 개수")
+    since: Optional[datetime] = Field(None, description="이 시각 이후 생성된 메모만 (포함)")
+    until: Optional[datetime] = Field(None, description="이 시각 이전 생성된 메모만 (미포함)")
+    mode: Literal["vector", "hybrid"] = Field(
+        "vector",
+        description="검색 방식 (vector: 의미 유사도, hybrid: 키워드 전문 검색 + 의미 유사도 융합)"
+    )
 
 
 class RecalledNote(BaseModel):
@@ -32,3 +38,18 @@ class MemoryCluster(BaseModel):
 class RecallResponse(BaseModel):
     """재등장 응답"""
     recalled_memories: List[MemoryCluster]
+
+
+class RecallBatchRequest(BaseModel):
+    """여러 질문 재등장 요청 (한 번에 처리)"""
+    queries: List[Annotated[str, Field(min_length=1)]] = Field(
+        ..., min_length=1, max_length=64, description="질문 또는 사고 내용 리스트"
+    )
+    limit: int = Field(10, ge=1, le=50, description="질문별 최대 반환 개수")
+    since: Optional[datetime] = Field(None, description="이 시각 이후 생성된 메모만 (포함)")
+    until: Optional[datetime] = Field(None, description="이 시각 이전 생성된 메모만 (미포함)")
+
+
+class RecallBatchResponse(BaseModel):
+    """여러 질문 재등장 응답 (요청의 질문 순서대로)"""
+    results: List[RecallResponse]
@@ -0,0 +1,153 @@
+"""
+요청 수용(Admission) 제어 서비스
+임베딩 모델을 쓰는 작업의 동시 실행 수와 대기열을 제한
+"""
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+import asyncio
+import heapq
+import itertools
+from app.config import settings
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0  # 재등장/그래프 검색 등 사용자가 기다리는 요청
+PRIORITY_BULK = 1  # 메모 저장/수정 등 쓰기 요청
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BULK: "bulk",
+}
+
+
+class AdmissionRejected(Exception):
+    """수용할 수 없는 요청 (대기열 초과 또는 대기 시간 초과)"""
+    
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    우선순위 대기열을 가진 동시 실행 제한기
+    - 동시에 max_concurrency개까지만 실행
+    - 우선순위별로 max_queue[우선순위]개까지 대기, 초과하면 즉시 429
+      (대량 쓰기 요청이 대기열을 채워도 대화형 요청 자리는 남아 있음)
+    - max_wait_seconds 안에 차례가 오지 않으면 503
+    - 빈 자리가 나면 우선순위가 높은(숫자가 작은) 요청부터 실행
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: Dict[int, int],
+        max_wait_seconds: float,
+        retry_after_seconds: int
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.retry_after_seconds = retry_after_seconds
+        
+        self._active = 0
+        self._queued: Dict[int, int] = {priority: 0 for priority in PRIORITY_NAMES}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []  # (우선순위, 순번, future) 힙
+        self._sequence = itertools.count()
+        
+        self._admitted: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        self._rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+    
+    @property
+    def capacity(self) -> int:
+        """동시에 들어와 있을 수 있는 최대 요청 수 (실행 중 + 모든 대기열)"""
+        return self.max_concurrency + sum(self.max_queue.values())
+    
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE):
+        """
+        실행 슬롯 획득 컨텍스트
+        
+        Args:
+            priority: 요청 우선순위
+            
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나 대기 시간을 초과한 경우
+        """
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    async def _acquire(self, priority: int) -> None:
+        if self._active < self.max_concurrency and not any(self._queued.values()):
+            self._active += 1
+            self._admitted[PRIORITY_NAMES[priority]] += 1
+            return
+        
+        if self._queued[priority] >= self.max_queue[priority]:
+            self._rejected["queue_full"] += 1
+            raise AdmissionRejected(429, "요청이 많아 처리할 수 없습니다", self.retry_after_seconds)
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._queued[priority] += 1
+        
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._abandon(priority, future)
+            self._rejected["timeout"] += 1
+            raise AdmissionRejected(503, "대기 시간이 초과되었습니다", self.retry_after_seconds)
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등으로 대기 중 취소됨
+            self._abandon(priority, future)
+            raise
+        
+        self._admitted[PRIORITY_NAMES[priority]] += 1
+    
+    def _abandon(self, priority: int, future: asyncio.Future) -> None:
+        """대기를 포기한 요청 정리 (그 사이 슬롯을 넘겨받았다면 반납)"""
+        if future.done() and not future.cancelled():
+            self._release()
+        elif not future.done():
+            future.cancel()
+            self._queued[priority] -= 1
+        else:
+            self._queued[priority] -= 1
+    
+    def _release(self) -> None:
+        """슬롯 반납 (대기 중인 요청이 있으면 바로 넘겨줌)"""
+        while self._waiters:
+            priority, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # 이미 포기한 요청
+            self._queued[priority] -= 1
+            future.set_result(None)
+            return
+        self._active -= 1
+    
+    def stats(self) -> dict:
+        """관측용 상태 (대기열 길이, 거절 수 등)"""
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queued": {PRIORITY_NAMES[p]: count for p, count in self._queued.items()},
+            "max_queue": {PRIORITY_NAMES[p]: limit for p, limit in self.max_queue.items()},
+            "admitted": dict(self._admitted),
+            "rejected": dict(self._rejected),
+        }
+
+
+# 전역 수용 제어 인스턴스 (임베딩 모델 사용 구간)
+embedding_admission = AdmissionController(
+    max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+    max_queue={
+        PRIORITY_INTERACTIVE: settings.EMBEDDING_MAX_QUEUE,
+        PRIORITY_BULK: settings.EMBEDDING_MAX_BULK_QUEUE,
+    },
+    max_wait_seconds=settings.EMBEDDING_MAX_WAIT_SECONDS,
+    retry_after_seconds=settings.EMBEDDING_RETRY_AFTER_SECONDS
+)
@@ -0,0 +1,128 @@
+"""
+백그라운드 작업 서비스
+요청 경로 밖에서 주기적으로 파생 데이터를 정리/재계산
+"""
+from typing import Callable, List, Optional
+import asyncio
+import logging
+import time
+from app.config import settings
+from app.database import SessionLocal
+from app.services.change_tracking import change_versions
+from app.services.linking import linking_service
+from app.services.neighbors import neighbor_service
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    주기 작업 하나
+    - 동기 함수를 스레드에서 실행 (이벤트 루프를 막지 않음)
+    - 실패해도 다음 주기에 다시 실행
+    """
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], List[str]]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.last_run_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await asyncio.to_thread(self.func)
+                self.last_error = None
+            except Exception as exc:  # 작업 하나의 실패로 루프가 끝나지 않도록
+                logger.exception("백그라운드 작업 실패: %s", self.name)
+                self.last_error = str(exc)
+            self.last_run_at = time.time()
+
+    def start(self) -> None:
+        """주기 실행 시작 (주기가 0 이하면 비활성)"""
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """주기 실행 중단"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """관측용 작업 상태"""
+        return {
+            "name": self.name,
+            "enabled": self.interval_seconds > 0,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error
+        }
+
+
+def _commit_changes(db, spaces: List[str]) -> None:
+    """변경된 공간의 버전을 올리고 커밋 후 캐시된 버전 무효화"""
+    for space in spaces:
+        change_versions.bump(db, space)
+    db.commit()
+    for space in spaces:
+        change_versions.invalidate(space)
+
+
+def refresh_neighbor_lists() -> List[str]:
+    """
+    계산되지 않은(NEIGHBOR_MAX_AGE_SECONDS > 0이면 오래된 목록도) 이웃 목록 한 배치 재계산
+    연결이 실제로 바뀐 공간만 버전을 올림 (변경이 없으면 ETag 유지)
+
+    Returns:
+        연결이 바뀐 공간 리스트
+    """
+    db = SessionLocal()
+    try:
+        spaces = neighbor_service.refresh_stale(
+            db,
+            settings.NEIGHBOR_REFRESH_BATCH,
+            settings.NEIGHBOR_MAX_AGE_SECONDS
+        )
+        _commit_changes(db, spaces)
+        return spaces
+    finally:
+        db.close()
+
+
+def compact_links() -> List[str]:
+    """
+    연결 수 제한을 넘은 메모들의 연결 한 배치 정리
+
+    Returns:
+        변경된 공간 리스트
+    """
+    db = SessionLocal()
+    try:
+        spaces = linking_service.compact_links(db, settings.LINK_COMPACTION_BATCH)
+        _commit_changes(db, spaces)
+        return spaces
+    finally:
+        db.close()
+
+
+# 전역 백그라운드 작업 목록
+background_jobs = [
+    PeriodicJob(
+        "neighbor_refresh",
+        settings.NEIGHBOR_REFRESH_INTERVAL_SECONDS,
+        refresh_neighbor_lists
+    ),
+    PeriodicJob(
+        "link_compaction",
+        settings.LINK_COMPACTION_INTERVAL_SECONDS,
+        compact_links
+    ),
+]
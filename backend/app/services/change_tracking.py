@@ -0,0 +1,129 @@
+"""
+변경 추적 서비스
+공간별 변경 버전 관리와 조회 응답 캐시
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import threading
+import time
+from app.config import settings
+
+# :space 공간 버전 증가 (다른 쓰기 문장의 데이터 변경 CTE 안에서도 사용)
+BUMP_VERSION_SQL = """
+    INSERT INTO change_versions (space, version, updated_at)
+    VALUES (:space, 1, NOW())
+    ON CONFLICT (space) DO UPDATE
+    SET version = change_versions.version + 1,
+        updated_at = NOW()
+"""
+
+
+class ChangeVersionService:
+    """
+    공간별 변경 버전 서비스
+    - 쓰기 트랜잭션 안에서 버전 증가 (다른 워커/프로세스도 같은 값을 봄)
+    - 조회 시에는 짧은 TTL 동안 메모리 값을 재사용해 폴링이 DB를 거의 건드리지 않음
+    - 캐시는 읽은 DB(주 DB/복제본)별로 따로 유지해 복제 지연된 데이터에 새 버전이 붙지 않게 함
+    """
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[Tuple[str, str], Tuple[int, Optional[datetime], float]] = {}  # (space, DB) -> (버전, 변경 시각, 조회 시각)
+        self._lock = threading.Lock()
+    
+    def bump(self, db: Session, space: str) -> None:
+        """
+        공간 버전 증가 (호출한 트랜잭션과 함께 커밋됨)
+        
+        Args:
+            db: 데이터베이스 세션
+            space: 메모 공간
+        """
+        db.execute(text(BUMP_VERSION_SQL), {"space": space})
+    
+    def invalidate(self, space: str) -> None:
+        """커밋 후 이 프로세스의 캐시된 버전 제거"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == space]:
+                del self._cache[key]
+    
+    def current(self, db: Session, space: str) -> Tuple[int, Optional[datetime]]:
+        """
+        공간의 현재 버전 조회
+        
+        Args:
+            db: 데이터베이스 세션 (응답 데이터를 읽을 세션과 같은 DB)
+            space: 메모 공간
+            
+        Returns:
+            (버전, 마지막 변경 시각) - 변경 이력이 없으면 (0, None)
+        """
+        key = (space, str(db.get_bind().url))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and now - cached[2] < self.ttl_seconds:
+            return cached[0], cached[1]
+        
+        row = db.execute(
+            text("SELECT version, updated_at FROM change_versions WHERE space = :space"),
+            {"space": space}
+        ).first()
+        
+        version, updated_at = (row.version, row.updated_at) if row else (0, None)
+        with self._lock:
+            self._cache[key] = (version, updated_at, now)
+        return version, updated_at
+
+
+class ResponseCache:
+    """
+    직렬화된 조회 응답 캐시 (프로세스 내 공유, LRU + TTL)
+    - 키에 공간 버전이 포함되므로 데이터가 바뀌면 자연히 새 키를 사용
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """캐시된 응답 본문 조회 (없거나 만료되면 None)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, stored_at = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+    
+    def set(self, key: str, body: bytes) -> None:
+        """응답 본문 저장"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (body, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# 전역 변경 추적 인스턴스
+change_versions = ChangeVersionService(settings.CHANGE_VERSION_TTL_SECONDS)
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_MAX_ENTRIES
+)
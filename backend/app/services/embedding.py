@@ -5,7 +5,11 @@ sentence-transformers를 사용한 다국어 임베딩
 from sentence_transformers import SentenceTransformer
 from typing import List
 from app.config import settings
+from app.services.admission import embedding_admission, PRIORITY_INTERACTIVE
+from app.services.snapshot import iter_snapshot_embeddings
+import asyncio
 import hashlib
+import numpy as np
 
 
 class EmbeddingService:
@@ -13,24 +17,92 @@ class EmbeddingService:
     임베딩 생성 및 캐싱 서비스
     - 로컬 실행 가능한 다국어 모델 사용
     - 메모리 캐싱으로 중복 계산 방지
+    - 모델 실행은 수용 제어 슬롯 안에서 스레드로 처리 (이벤트 루프를 막지 않음)
     """
     
     def __init__(self):
         print(f"임베딩 모델 로드 중: {settings.EMBEDDING_MODEL}")
         self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
         self.cache = {}  # 간단한 메모리 캐시
+        # 스냅샷 예열 임베딩 (float32 행렬 + 원문 해시 → 행 번호)
+        self.warm_matrix = np.empty((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        self.warm_rows = {}
         print("임베딩 모델 로드 완료")
     
     def _get_cache_key(self, text: str) -> str:
         """텍스트의 캐시 키 생성"""
         return hashlib.md5(text.encode('utf-8')).hexdigest()
     
-    async def get_embedding(self, text: str) -> List[float]:
+    async def _encode(self, texts, priority: int):
+        """수용 제어 슬롯을 얻은 뒤 워커 스레드에서 모델 실행"""
+        async with embedding_admission.slot(priority):
+            return await asyncio.to_thread(
+                self.model.encode,
+                texts,
+                normalize_embeddings=True
+            )
+    
+    def _cached(self, cache_key: str):
+        """캐시 또는 예열 행렬에서 임베딩 찾기 (없으면 None)"""
+        embedding = self.cache.get(cache_key)
+        if embedding is not None:
+            return embedding
+        row = self.warm_rows.get(cache_key)
+        if row is not None:
+            return self.warm_matrix[row].tolist()
+        return None
+    
+    def warm_start(self, path: str, max_notes: int = settings.SNAPSHOT_WARM_START_MAX_NOTES) -> int:
+        """
+        스냅샷 파일의 원문/임베딩으로 예열 행렬 채우기 (모델 실행 없음)
+        - 임베딩은 float32 행렬 하나에 모으고 원문 해시 → 행 번호만 dict로 보관
+          (파이썬 float 리스트로 풀면 384차원 기준 메모당 약 12KB)
+        
+        Args:
+            path: 스냅샷 파일 경로
+            max_notes: 예열할 최대 임베딩 수
+            
+        Returns:
+            예열 행렬에 넣은 임베딩 수
+        """
+        blocks = []
+        rows = {}
+        for contents, embeddings in iter_snapshot_embeddings(path, settings.EMBEDDING_DIMENSION):
+            block = []
+            for content, embedding in zip(contents, embeddings):
+                if len(rows) >= max_notes:
+                    break
+                if content is None or embedding is None:
+                    continue
+                cache_key = self._get_cache_key(content)
+                if cache_key in rows:
+                    continue
+                rows[cache_key] = len(rows)
+                block.append(embedding)
+            if block:
+                # 청크 버퍼를 붙잡지 않도록 필요한 행만 복사
+                blocks.append(np.array(block, dtype=np.float32))
+            if len(rows) >= max_notes:
+                break
+        
+        self.warm_matrix = (
+            np.concatenate(blocks) if blocks
+            else np.empty((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        )
+        self.warm_rows = rows
+        return len(rows)
+    
+    async def get_embedding(
+        self,
+        text: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> List[float]:
         """
         텍스트의 임베딩 벡터 생성
         
         Args:
             text: 임베딩할 텍스트
+            priority: 모델 대기열 우선순위 (캐시에 있으면 대기하지 않음)
             
         Returns:
             임베딩 벡터 (384차원)
@@ -38,23 +110,29 @@ class EmbeddingService:
         cache_key = self._get_cache_key(text)
         
         # 캐시 확인
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return cached
         
         # 임베딩 생성
-        embedding = self.model.encode(text, normalize_embeddings=True).tolist()
+        embedding = (await self._encode(text, priority)).tolist()
         
         # 캐시 저장
         self.cache[cache_key] = embedding
         
         return embedding
     
-    async def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    async def get_embeddings_batch(
+        self,
+        texts: List[str],
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> List[List[float]]:
         """
         여러 텍스트의 임베딩을 배치로 생성
         
         Args:
             texts: 임베딩할 텍스트 리스트
+            priority: 모델 대기열 우선순위
             
         Returns:
             임베딩 벡터 리스트
@@ -65,19 +143,16 @@ class EmbeddingService:
         results = [None] * len(texts)
         
         for i, text in enumerate(texts):
-            cache_key = self._get_cache_key(text)
-            if cache_key in self.cache:
-                results[i] = self.cache[cache_key]
+            cached = self._cached(self._get_cache_key(text))
+            if cached is not None:
+                results[i] = cached
             else:
                 uncached_texts.append(text)
                 uncached_indices.append(i)
         
         # 캐시되지 않은 텍스트들을 배치로 처리
         if uncached_texts:
-            embeddings = self.model.encode(
-                uncached_texts, 
-                normalize_embeddings=True
-            ).tolist()
+            embeddings = (await self._encode(uncached_texts, priority)).tolist()
             
             # 결과 저장 및 캐싱
             for i, embedding in zip(uncached_indices, embeddings):
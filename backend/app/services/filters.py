@@ -0,0 +1,47 @@
+"""
+메모 조회 공통 필터
+여러 API/서비스에서 공유하는 WHERE 조건 생성
+"""
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+
+def build_note_filters(
+    alias: str = "",
+    space: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Tuple[str, Dict]:
+    """
+    메모 공간/시간 범위 조건을 SQL 조각으로 생성
+
+    값이 주어진 조건만 SQL에 포함시켜 플래너가 (space, created_at) 인덱스와
+    공간별 벡터 인덱스로 해당 범위의 행만 읽을 수 있게 함
+
+    Args:
+        alias: notes 테이블 별칭 (예: "n")
+        space: 메모 공간 (테넌트)
+        since: 이 시각 이후 생성된 메모만 (포함)
+        until: 이 시각 이전 생성된 메모만 (미포함)
+
+    Returns:
+        (" AND ..." 형태의 SQL 조각, 바인딩 파라미터)
+    """
+    prefix = f"{alias}." if alias else ""
+    clauses = []
+    params = {}
+
+    if space is not None:
+        clauses.append(f"{prefix}space = :space")
+        params["space"] = space
+
+    if since is not None:
+        clauses.append(f"{prefix}created_at >= :since")
+        params["since"] = since
+
+    if until is not None:
+        clauses.append(f"{prefix}created_at < :until")
+        params["until"] = until
+
+    sql = "".join(f" AND {clause}" for clause in clauses)
+    return sql, params
@@ -0,0 +1,266 @@
+"""
+그래프 레이아웃 계산 서비스
+서버에서 노드 좌표를 미리 계산해 클라이언트 렌더링 부담을 줄임
+"""
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+import hashlib
+import numpy as np
+from app.models.note import Note
+from app.schemas.graph import GraphEdge
+
+
+class LayoutService:
+    """
+    그래프 레이아웃 서비스
+    - 임베딩 투영(PCA)으로 초기 위치 결정
+    - NumPy 벡터 연산 기반 force-directed 레이아웃 (Fruchterman-Reingold)
+    - 그래프 버전별 결과 캐싱, 새 노드가 생기면 기존 좌표에서 점진적으로 보정
+    """
+
+    def __init__(
+        self,
+        iterations: int = 60,
+        refine_iterations: int = 15,
+        max_cached_layouts: int = 64
+    ):
+        self.iterations = iterations
+        self.refine_iterations = refine_iterations
+        self.max_cached_layouts = max_cached_layouts
+        self._layouts: "OrderedDict[str, Dict[int, Tuple[float, float]]]" = OrderedDict()  # 그래프 버전 -> 정규화 좌표
+        self._positions: Dict[str, Dict[int, np.ndarray]] = {}  # 공간별 노드 원좌표 (점진적 보정용)
+
+    def graph_version(self, space: str, node_ids: List[int], edges: List[GraphEdge]) -> str:
+        """
+        노드/엣지 구성으로부터 그래프 버전 키 생성
+
+        Args:
+            space: 메모 공간
+            node_ids: 노드 ID 리스트
+            edges: 엣지 리스트
+
+        Returns:
+            그래프 버전 문자열
+        """
+        digest = hashlib.sha1(space.encode("utf-8"))
+        digest.update(np.asarray(sorted(node_ids), dtype=np.int64).tobytes())
+        for edge in sorted(edges, key=lambda e: (e.source, e.target)):
+            digest.update(f"{edge.source}:{edge.target}:{edge.strength:.3f};".encode("utf-8"))
+        return digest.hexdigest()
+
+    def compute(
+        self,
+        db: Session,
+        space: str,
+        node_ids: List[int],
+        edges: List[GraphEdge]
+    ) -> Dict[int, Tuple[float, float]]:
+        """
+        노드 좌표 계산 (0.0 ~ 1.0 범위로 정규화)
+
+        Args:
+            db: 데이터베이스 세션
+            space: 메모 공간
+            node_ids: 노드 ID 리스트
+            edges: 노드들 간의 엣지 리스트
+
+        Returns:
+            노드 ID -> (x, y) 좌표
+        """
+        if not node_ids:
+            return {}
+
+        version = self.graph_version(space, node_ids, edges)
+        if version in self._layouts:
+            self._layouts.move_to_end(version)
+            return self._layouts[version]
+
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        edge_index = np.array(
+            [(index[e.source], index[e.target]) for e in edges
+             if e.source in index and e.target in index],
+            dtype=np.int64
+        ).reshape(-1, 2)
+        edge_weight = np.array(
+            [e.strength for e in edges if e.source in index and e.target in index],
+            dtype=np.float64
+        )
+
+        known = self._positions.setdefault(space, {})
+        positions, is_refinement = self._initial_positions(
+            db, node_ids, known, edge_index
+        )
+
+        iterations = self.refine_iterations if is_refinement else self.iterations
+        positions = self._force_layout(positions, edge_index, edge_weight, iterations)
+
+        for node_id, i in index.items():
+            known[node_id] = positions[i]
+
+        layout = self._normalize(node_ids, positions)
+        self._layouts[version] = layout
+        if len(self._layouts) > self.max_cached_layouts:
+            self._layouts.popitem(last=False)
+
+        return layout
+
+    def forget(self, space: str, note_ids: List[int]) -> None:
+        """
+        특정 메모들의 캐시된 좌표 제거 (수정/삭제 시)
+
+        Args:
+            space: 메모 공간
+            note_ids: 제거할 메모 ID 리스트
+        """
+        known = self._positions.get(space, {})
+        for note_id in note_ids:
+            known.pop(note_id, None)
+
+    def _initial_positions(
+        self,
+        db: Session,
+        node_ids: List[int],
+        known: Dict[int, np.ndarray],
+        edge_index: np.ndarray
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        초기 좌표 결정
+        - 이전에 계산된 노드는 기존 좌표 재사용
+        - 새 노드는 이미 배치된 이웃들의 중심, 이웃이 없으면 임베딩 PCA 투영 위치
+
+        Returns:
+            (초기 좌표 배열, 기존 좌표를 재사용했는지 여부)
+        """
+        n = len(node_ids)
+        positions = np.zeros((n, 2), dtype=np.float64)
+        placed = np.zeros(n, dtype=bool)
+
+        for i, node_id in enumerate(node_ids):
+            if node_id in known:
+                positions[i] = known[node_id]
+                placed[i] = True
+
+        missing = [i for i in range(n) if not placed[i]]
+        if not missing:
+            return positions, True
+
+        projected = self._project_embeddings(db, [node_ids[i] for i in missing])
+        rng = np.random.default_rng(len(missing))
+
+        for j, i in enumerate(missing):
+            neighbours = np.concatenate([
+                edge_index[edge_index[:, 0] == i, 1],
+                edge_index[edge_index[:, 1] == i, 0]
+            ])
+            neighbours = neighbours[placed[neighbours]] if neighbours.size else neighbours
+            if neighbours.size:
+                positions[i] = positions[neighbours].mean(axis=0) + rng.normal(0, 0.05, 2)
+            else:
+                positions[i] = projected[j]
+
+        return positions, bool(placed.any())
+
+    def _project_embeddings(self, db: Session, note_ids: List[int]) -> np.ndarray:
+        """
+        임베딩을 PCA로 2차원 투영 (의미가 가까운 메모가 가까운 위치에서 시작)
+
+        Returns:
+            note_ids 순서의 (n, 2) 좌표 배열
+        """
+        rng = np.random.default_rng(len(note_ids))
+        fallback = rng.uniform(-1.0, 1.0, size=(len(note_ids), 2))
+
+        rows = (
+            db.query(Note.id, Note.embedding)
+            .filter(Note.id.in_(note_ids), Note.embedding.isnot(None))
+            .all()
+        )
+        embeddings = {
+            row.id: np.asarray(row.embedding, dtype=np.float64)
+            for row in rows
+        }
+
+        indices = [i for i, note_id in enumerate(note_ids) if note_id in embeddings]
+        if len(indices) < 3:
+            return fallback
+
+        matrix = np.stack([embeddings[note_ids[i]] for i in indices])
+        matrix -= matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix, full_matrices=False)
+        projected = matrix @ vt[:2].T
+
+        scale = np.abs(projected).max()
+        if scale > 0:
+            projected /= scale
+
+        fallback[indices] = projected
+        return fallback
+
+    def _force_layout(
+        self,
+        positions: np.ndarray,
+        edge_index: np.ndarray,
+        edge_weight: np.ndarray,
+        iterations: int
+    ) -> np.ndarray:
+        """
+        Fruchterman-Reingold 레이아웃 (모든 노드 쌍을 한 번에 벡터 연산)
+
+        Returns:
+            보정된 좌표 배열
+        """
+        n = positions.shape[0]
+        if n == 1:
+            return positions
+
+        k = np.sqrt(4.0 / n)  # 이상적인 노드 간 거리
+        temperature = 0.1 if iterations <= self.refine_iterations else 0.3
+        cooling = temperature / (iterations + 1)
+
+        for _ in range(iterations):
+            delta = positions[:, None, :] - positions[None, :, :]
+            distance = np.linalg.norm(delta, axis=-1)
+            np.fill_diagonal(distance, 1.0)
+            distance = np.maximum(distance, 1e-3)
+
+            # 척력: 모든 노드 쌍
+            # (자기 자신과의 delta는 0이므로 대각 성분은 자동으로 0)
+            repulsion = (k * k / distance ** 2)[:, :, None] * delta
+            displacement = repulsion.sum(axis=1)
+
+            # 인력: 연결된 노드 쌍 (강한 연결일수록 가까이)
+            if edge_index.size:
+                src, dst = edge_index[:, 0], edge_index[:, 1]
+                edge_delta = positions[src] - positions[dst]
+                edge_distance = np.linalg.norm(edge_delta, axis=-1, keepdims=True)
+                attraction = edge_delta * edge_distance / k * edge_weight[:, None]
+                np.add.at(displacement, src, -attraction)
+                np.add.at(displacement, dst, attraction)
+
+            length = np.maximum(np.linalg.norm(displacement, axis=-1, keepdims=True), 1e-9)
+            positions = positions + displacement / length * np.minimum(length, temperature)
+            temperature = max(temperature - cooling, 1e-3)
+
+        return positions
+
+    def _normalize(
+        self,
+        node_ids: List[int],
+        positions: np.ndarray
+    ) -> Dict[int, Tuple[float, float]]:
+        """좌표를 0.0 ~ 1.0 범위로 정규화"""
+        low = positions.min(axis=0)
+        span = positions.max(axis=0) - low
+        flat = span == 0
+        span[flat] = 1.0
+        normalized = (positions - low) / span
+        normalized[:, flat] = 0.5  # 한 축으로 퍼지지 않은 경우 가운데 배치
+        return {
+            node_id: (float(normalized[i, 0]), float(normalized[i, 1]))
+            for i, node_id in enumerate(node_ids)
+        }
+
+
+# 전역 레이아웃 서비스 인스턴스
+layout_service = LayoutService()
@@ -4,130 +4,374 @@
 """
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List
-from app.models.note import Note
-from app.models.memory_link import MemoryLink
+from typing import List, Optional, Tuple
 from app.config import settings
+from app.services.filters import build_note_filters
+from app.services.vector_search import vector_search
+from app.services.change_tracking import BUMP_VERSION_SQL
 
 
 class LinkingService:
     """
     메모 간 자동 연결 서비스
     - pgvector를 사용한 유사도 검색
-    - 임계값 이상인 메모들과 자동 연결
+    - 임계값 이상인 메모들과 자동 연결 (NeighborService.sync_links가 이웃 목록에서 파생)
+    - 메모별 연결 수 제한 (양쪽 모두의 강도 상위 k개 안에 드는 연결만 유지)
+    - 관련 메모/그래프/이웃 탐색/재등장 클러스터링은 모두 memory_links를 읽음
     """
     
-    async def create_links(
-        self, 
-        db: Session, 
-        new_note: Note, 
-        top_k: int = 10
-    ) -> List[MemoryLink]:
+    async def create_note_with_links(
+        self,
+        db: Session,
+        space: str,
+        content: str,
+        embedding: List[float],
+        content_hash: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        top_k: int = settings.NEIGHBOR_TOP_K,
+        max_links: int = settings.MAX_LINKS_PER_NOTE
+    ) -> Tuple[dict, List[dict]]:
         """
-        새 메모와 기존 메모들 간의 자동 연결 생성
+        메모 저장부터 연결 생성까지 한 문장으로 처리 (커밋하지 않음)
+        
+        하나의 SQL 안에서
+        1. 임베딩과 함께 메모 INSERT
+        2. 같은 공간에서 유사한 메모 top_k개 검색
+        3. 새 메모의 이웃 목록 저장, 이웃들의 목록에 새 메모를 넣고 top-k로 잘라냄
+        4. 연결 수 제한(NeighborService.sync_links와 같은 규칙)을 통과한 이웃과 양방향 연결,
+           새 메모에 밀려 제한 밖으로 나간 기존 연결 삭제
+        5. 공간 변경 버전 증가
+        6. 저장된 메모와 연결된 메모 정보 반환 (조회 API와 같은 집합)
         
         Args:
             db: 데이터베이스 세션
-            new_note: 새로 생성된 메모
-            top_k: 상위 K개의 유사 메모 검색
+            space: 메모 공간
+            content: 메모 원문
+            embedding: 메모 임베딩
+            content_hash: 원문 해시
+            idempotency_key: 생성 요청의 Idempotency-Key
+            top_k: 상위 K개의 유사 메모 검색 (이웃 목록 크기)
+            max_links: 메모별 최대 연결 수 (0이면 제한 없음)
             
         Returns:
-            생성된 MemoryLink 리스트
+            (저장된 메모 정보, 연결된 메모 정보 리스트 - 강도 내림차순)
         """
-        if new_note.embedding is None:
-            return []
+        # 작은 공간은 정확 검색, 큰 공간은 후보를 넉넉히 둔 HNSW 검색
+        space_sql, space_params = build_note_filters(space=space)
+        scan = vector_search.candidate_scan(db, space_sql, space_params, top_k)
         
-        # pgvector의 코사인 거리로 유사 메모 검색
-        # 코사인 거리: 1 - 코사인 유사도
-        # 따라서 거리가 작을수록 유사함
-        query = text("""
+        if max_links > 0:
+            # 양쪽 목록 모두에서 상위 link_cap개 안에 들어야 연결
+            link_cap = min(max_links, top_k)
+            linked_sql = "AND o.rank <= :link_cap AND m.rank <= :link_cap"
+            displaced_sql = "m.rank > :link_cap"
+        else:
+            # 제한이 없으면 어느 한쪽 목록에만 있어도 연결
+            link_cap = top_k
+            linked_sql = ""
+            displaced_sql = """m.rank > :link_cap
+                    AND NOT EXISTS (
+                        SELECT 1 FROM note_neighbors back
+                        WHERE back.note_id = m.neighbor_id AND back.neighbor_id = m.note_id
+                    )"""
+        
+        # 데이터 변경 CTE의 다른 부분은 INSERT 이전 스냅샷을 보므로
+        # neighbours에는 새 메모 자신이 포함되지 않고, 이웃들의 목록(merged)에서는
+        # 아직 ID가 없는 새 메모를 neighbor_id NULL로 두고 순위를 매김
+        # (ID가 가장 크므로 동점이면 trim_lists_containing과 같이 뒤로)
+        query = text(f"""
+            WITH candidates AS {scan} (
+                SELECT id, content, created_at, embedding
+                FROM notes
+                WHERE space = :space
+                    AND embedding IS NOT NULL
+            ),
+            new_note AS (
+                INSERT INTO notes (
+                    space, content, content_hash, idempotency_key, embedding,
+                    neighbors_updated_at
+                )
+                VALUES (
+                    :space, :content, :content_hash, :idempotency_key,
+                    CAST(:embedding AS vector), NOW()
+                )
+                RETURNING id, content, created_at
+            ),
+            neighbours AS (
+                SELECT 
+                    id,
+                    content,
+                    created_at,
+                    1 - (embedding <=> CAST(:embedding AS vector)) as similarity
+                FROM candidates
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :limit
+            ),
+            own_ranked AS (
+                SELECT
+                    id,
+                    similarity,
+                    row_number() OVER (ORDER BY similarity DESC, id) AS rank
+                FROM neighbours
+            ),
+            merged_ranked AS (
+                SELECT
+                    note_id,
+                    neighbor_id,
+                    row_number() OVER (
+                        PARTITION BY note_id
+                        ORDER BY similarity DESC, neighbor_id NULLS LAST
+                    ) AS rank
+                FROM (
+                    SELECT note_id, neighbor_id, similarity
+                    FROM note_neighbors
+                    WHERE note_id IN (SELECT id FROM neighbours)
+                    UNION ALL
+                    SELECT id, NULL, similarity
+                    FROM neighbours
+                ) merged
+            ),
+            new_neighbours AS (
+                INSERT INTO note_neighbors (note_id, neighbor_id, similarity)
+                SELECT nn.id, o.id, o.similarity
+                FROM new_note nn CROSS JOIN own_ranked o
+                UNION ALL
+                SELECT m.note_id, nn.id, o.similarity
+                FROM new_note nn
+                CROSS JOIN merged_ranked m
+                JOIN own_ranked o ON o.id = m.note_id
+                WHERE m.neighbor_id IS NULL
+                    AND m.rank <= :limit
+            ),
+            trimmed AS (
+                DELETE FROM note_neighbors nn
+                USING merged_ranked m
+                WHERE nn.note_id = m.note_id
+                    AND nn.neighbor_id = m.neighbor_id
+                    AND m.rank > :limit
+            ),
+            linked AS (
+                SELECT nb.id, nb.content, nb.created_at, nb.similarity
+                FROM neighbours nb
+                JOIN own_ranked o ON o.id = nb.id
+                JOIN merged_ranked m ON m.note_id = nb.id AND m.neighbor_id IS NULL
+                WHERE nb.similarity >= :threshold
+                    {linked_sql}
+            ),
+            new_links AS (
+                INSERT INTO memory_links (source_note_id, target_note_id, strength, reason)
+                SELECT nn.id, l.id, l.similarity, 'semantic similarity'
+                FROM new_note nn CROSS JOIN linked l
+                UNION ALL
+                SELECT l.id, nn.id, l.similarity, 'semantic similarity'
+                FROM new_note nn CROSS JOIN linked l
+            ),
+            displaced AS (
+                SELECT m.note_id, m.neighbor_id
+                FROM merged_ranked m
+                JOIN notes other ON other.id = m.neighbor_id
+                WHERE other.neighbors_updated_at IS NOT NULL
+                    AND {displaced_sql}
+            ),
+            unlinked AS (
+                DELETE FROM memory_links ml
+                USING displaced d
+                WHERE (ml.source_note_id = d.note_id AND ml.target_note_id = d.neighbor_id)
+                    OR (ml.source_note_id = d.neighbor_id AND ml.target_note_id = d.note_id)
+            ),
+            bumped AS (
+                {BUMP_VERSION_SQL}
+            )
             SELECT 
-                id,
-                content,
-                created_at,
-                1 - (embedding <=> CAST(:embedding AS vector)) as similarity
-            FROM notes
-            WHERE id != :note_id
-                AND embedding IS NOT NULL
-            ORDER BY embedding <=> CAST(:embedding AS vector)
-            LIMIT :limit
+                nn.id AS note_id,
+                nn.content AS note_content,
+                nn.created_at AS note_created_at,
+                l.id,
+                l.content,
+                l.created_at,
+                l.similarity
+            FROM new_note nn
+            LEFT JOIN linked l ON TRUE
+            ORDER BY l.similarity DESC NULLS LAST
         """)
         
-        # numpy array인 경우 list로 변환 후 문자열로 직렬화 (pgvector 호환성)
-        embedding_value = new_note.embedding
-        if hasattr(embedding_value, 'tolist'):
-            embedding_value = embedding_value.tolist()
-        
-        # 리스트를 문자열로 변환 "[1.0, 2.0, ...]"
-        embedding_str = str(embedding_value)
-
         result = db.execute(
             query,
             {
-                "embedding": embedding_str,
-                "note_id": new_note.id,
-                "limit": top_k
+                "space": space,
+                "content": content,
+                "content_hash": content_hash,
+                "idempotency_key": idempotency_key,
+                "embedding": str(embedding),
+                "limit": top_k,
+                "link_cap": link_cap,
+                "threshold": settings.SIMILARITY_THRESHOLD
             }
         )
+        rows = result.fetchall()
         
-        similar_notes = result.fetchall()
+        note = {
+            "id": rows[0].note_id,
+            "content": rows[0].note_content,
+            "created_at": rows[0].note_created_at
+        }
+        related = [
+            {
+                "id": row.id,
+                "content": row.content,
+                "created_at": row.created_at,
+                "strength": float(row.similarity)
+            }
+            for row in rows
+            if row.id is not None
+        ]
+        
+        return note, related
+    
+    def prune_links(
+        self,
+        db: Session,
+        note_ids: List[int],
+        max_links: int = settings.MAX_LINKS_PER_NOTE
+    ) -> List[dict]:
+        """
+        메모들 주변의 연결을 차수 제한에 맞게 정리 (커밋하지 않음)
         
-        # 임계값 이상인 메모들과 연결 생성
-        created_links = []
-        for row in similar_notes:
-            similarity = float(row.similarity)
+        note_ids와 그 연결 상대 각각에서 강도 순위를 매겨
+        어느 한쪽에서라도 상위 max_links개 밖인 연결은 양방향 모두 삭제
+        (연결 테이블 크기가 메모 수 × max_links 이하로 유지됨)
+        
+        Args:
+            db: 데이터베이스 세션
+            note_ids: 연결이 추가/변경된 메모 ID 리스트
+            max_links: 메모별 최대 연결 수 (0이면 정리하지 않음)
             
-            if similarity >= settings.SIMILARITY_THRESHOLD:
-                # 양방향 연결 생성
-                # 1. new_note -> similar_note
-                link1 = MemoryLink(
-                    source_note_id=new_note.id,
-                    target_note_id=row.id,
-                    strength=similarity,
-                    reason="semantic similarity"
-                )
-                db.add(link1)
-                created_links.append(link1)
-                
-                # 2. similar_note -> new_note
-                link2 = MemoryLink(
-                    source_note_id=row.id,
-                    target_note_id=new_note.id,
-                    strength=similarity,
-                    reason="semantic similarity"
-                )
-                db.add(link2)
-                created_links.append(link2)
+        Returns:
+            삭제된 연결 리스트 (source_note_id, target_note_id, space)
+        """
+        if not note_ids or max_links <= 0:
+            return []
+        
+        query = text("""
+            WITH endpoints AS (
+                SELECT unnest(CAST(:note_ids AS integer[])) AS id
+                UNION
+                SELECT target_note_id
+                FROM memory_links
+                WHERE source_note_id = ANY(:note_ids)
+            ),
+            ranked AS (
+                SELECT 
+                    source_note_id,
+                    target_note_id,
+                    row_number() OVER (
+                        PARTITION BY source_note_id
+                        ORDER BY strength DESC, target_note_id
+                    ) AS rank
+                FROM memory_links
+                WHERE source_note_id IN (SELECT id FROM endpoints)
+            ),
+            dropped AS (
+                SELECT source_note_id, target_note_id
+                FROM ranked WHERE rank > :max_links
+                UNION
+                SELECT target_note_id, source_note_id
+                FROM ranked WHERE rank > :max_links
+            ),
+            deleted AS (
+                DELETE FROM memory_links ml
+                USING dropped d
+                WHERE ml.source_note_id = d.source_note_id
+                    AND ml.target_note_id = d.target_note_id
+                RETURNING ml.source_note_id, ml.target_note_id
+            )
+            SELECT d.source_note_id, d.target_note_id, n.space
+            FROM deleted d
+            JOIN notes n ON n.id = d.source_note_id
+        """)
         
-        db.commit()
+        result = db.execute(
+            query,
+            {"note_ids": note_ids, "max_links": max_links}
+        )
         
-        return created_links
+        return [
+            {
+                "source_note_id": row.source_note_id,
+                "target_note_id": row.target_note_id,
+                "space": row.space
+            }
+            for row in result.fetchall()
+        ]
+    
+    def compact_links(
+        self,
+        db: Session,
+        batch_size: int,
+        max_links: int = settings.MAX_LINKS_PER_NOTE
+    ) -> List[str]:
+        """
+        연결 수 제한을 넘은 메모들을 한 배치 정리 (커밋하지 않음)
+        제한 도입 이전 연결이나 제한 값을 낮춘 경우를 백그라운드에서 정리
+        
+        Args:
+            db: 데이터베이스 세션
+            batch_size: 한 번에 정리할 메모 수
+            max_links: 메모별 최대 연결 수 (0이면 정리하지 않음)
+            
+        Returns:
+            연결이 삭제된 공간 리스트
+        """
+        if max_links <= 0:
+            return []
+        
+        result = db.execute(
+            text("""
+                SELECT source_note_id
+                FROM memory_links
+                GROUP BY source_note_id
+                HAVING count(*) > :max_links
+                LIMIT :batch_size
+            """),
+            {"max_links": max_links, "batch_size": batch_size}
+        )
+        note_ids = [row.source_note_id for row in result.fetchall()]
+        
+        pruned = self.prune_links(db, note_ids, max_links)
+        return sorted({link["space"] for link in pruned})
     
     async def get_related_notes(
         self, 
         db: Session, 
         note_id: int, 
-        min_strength: float = 0.0
+        min_strength: Optional[float] = None
     ) -> List[dict]:
         """
         특정 메모와 연결된 메모들 조회
         
+        연결은 미리 계산된 이웃 목록에서 파생되므로(연결 수 제한 적용)
+        메모 생성 이후에 추가된 메모까지 반영되며, 그래프 엣지와 같은 집합을
+        source_note_id 인덱스 조회 한 번으로 읽음
+        
         Args:
             db: 데이터베이스 세션
             note_id: 메모 ID
-            min_strength: 최소 연결 강도
+            min_strength: 최소 연결 강도 (없으면 자동 연결 임계값)
             
         Returns:
             연결된 메모 정보 리스트
         """
+        if min_strength is None:
+            min_strength = settings.SIMILARITY_THRESHOLD
+        
         query = text("""
             SELECT 
                 n.id,
                 n.content,
                 n.created_at,
                 ml.strength
-            FROM notes n
-            JOIN memory_links ml ON n.id = ml.target_note_id
+            FROM memory_links ml
+            JOIN notes n ON n.id = ml.target_note_id
             WHERE ml.source_note_id = :note_id
                 AND ml.strength >= :min_strength
             ORDER BY ml.strength DESC
@@ -148,6 +392,144 @@ class LinkingService:
             })
         
         return related
+    
+    async def get_neighborhood(
+        self,
+        db: Session,
+        space: str,
+        note_id: Optional[int] = None,
+        query_embedding: Optional[List[float]] = None,
+        seed_count: int = 5,
+        depth: int = 2,
+        fan_out: int = 5,
+        min_strength: float = 0.75,
+        max_nodes: int = 200
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        메모 또는 질문 주변의 k-hop 이웃 탐색
+        
+        재귀 CTE 한 번으로 시작 메모 선택, 다단계 확장, 엣지 수집까지 처리
+        - 각 단계에서 노드당 강도 상위 fan_out개 연결만 따라감
+        - 경로에 이미 있는 메모로는 되돌아가지 않음 (사이클 억제)
+        
+        Args:
+            db: 데이터베이스 세션
+            space: 메모 공간
+            note_id: 시작 메모 ID (query_embedding과 둘 중 하나)
+            query_embedding: 시작 메모를 찾을 질문 임베딩
+            seed_count: 질문으로 찾을 시작 메모 수
+            depth: 최대 확장 단계 수
+            fan_out: 단계마다 노드당 따라갈 최대 연결 수
+            min_strength: 따라갈 최소 연결 강도
+            max_nodes: 반환할 최대 노드 수 (가까운 단계 우선)
+            
+        Returns:
+            (노드 리스트, 엣지 리스트)
+        """
+        candidates_sql = ""
+        if note_id is not None:
+            seed_sql = """
+                SELECT id FROM notes
+                WHERE id = :note_id AND space = :space
+            """
+        elif query_embedding is not None:
+            # 작은 공간은 정확 검색, 큰 공간은 후보를 넉넉히 둔 HNSW 검색
+            space_sql, space_params = build_note_filters(space=space)
+            scan = vector_search.candidate_scan(db, space_sql, space_params, seed_count)
+            candidates_sql = f"""
+            seed_candidates AS {scan} (
+                SELECT id, embedding FROM notes
+                WHERE space = :space AND embedding IS NOT NULL
+            ),"""
+            seed_sql = """
+                SELECT id FROM seed_candidates
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :seed_count
+            """
+        else:
+            return [], []
+        
+        query = text(f"""
+            WITH RECURSIVE{candidates_sql}
+            walk(note_id, depth, path) AS (
+                SELECT seeds.id, 0, ARRAY[seeds.id]
+                FROM ({seed_sql}) seeds
+                
+                UNION ALL
+                
+                SELECT nb.target_note_id, w.depth + 1, w.path || nb.target_note_id
+                FROM walk w
+                CROSS JOIN LATERAL (
+                    SELECT ml.target_note_id
+                    FROM memory_links ml
+                    WHERE ml.source_note_id = w.note_id
+                        AND ml.strength >= :min_strength
+                        AND ml.target_note_id <> ALL(w.path)
+                    ORDER BY ml.strength DESC
+                    LIMIT :fan_out
+                ) nb
+                WHERE w.depth < :depth
+            ),
+            reached AS (
+                SELECT note_id, MIN(depth) AS min_depth
+                FROM walk
+                GROUP BY note_id
+                ORDER BY min_depth
+                LIMIT :max_nodes
+            )
+            SELECT 
+                n.id,
+                n.content,
+                n.created_at,
+                r.min_depth,
+                COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'target', ml.target_note_id,
+                        'strength', ml.strength,
+                        'reason', ml.reason
+                    ))
+                    FROM memory_links ml
+                    WHERE ml.source_note_id = n.id
+                        AND ml.strength >= :min_strength
+                        AND ml.target_note_id IN (SELECT note_id FROM reached)
+                ), CAST('[]' AS json)) AS links
+            FROM reached r
+            JOIN notes n ON n.id = r.note_id
+            ORDER BY r.min_depth, n.created_at DESC
+        """)
+        
+        result = db.execute(
+            query,
+            {
+                "space": space,
+                "note_id": note_id,
+                "embedding": str(query_embedding) if query_embedding is not None else None,
+                "seed_count": seed_count,
+                "depth": depth,
+                "fan_out": fan_out,
+                "min_strength": min_strength,
+                "max_nodes": max_nodes
+            }
+        )
+        
+        nodes = []
+        edges = []
+        for row in result.fetchall():
+            nodes.append({
+                "id": row.id,
+                "content": row.content,
+                "created_at": row.created_at,
+                "depth": row.min_depth
+            })
+            for link in row.links:
+                edges.append({
+                    "source": row.id,
+                    "target": link["target"],
+                    "strength": float(link["strength"]),
+                    "reason": link["reason"]
+                })
+        
+        return nodes, edges
 
 
 # 전역 링킹 서비스 인스턴스
@@ -0,0 +1,368 @@
+"""
+이웃 목록 서비스
+메모별 top-k 이웃(note_neighbors)을 점진적으로 유지
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List
+from app.config import settings
+from app.services.filters import build_note_filters
+from app.services.vector_search import vector_search
+
+
+class NeighborService:
+    """
+    메모별 이웃 목록 서비스
+    - 새 메모: 저장 문장에서 양방향으로 추가한 뒤 목록별 top-k만 남김
+    - 수정: 해당 메모 목록을 다시 계산하고, 이 메모가 들어 있는 목록의 항목은
+      새 임베딩 기준 유사도로 바꾼 뒤 다시 순위를 매겨 top-k만 남김
+    - 삭제: 이 메모 항목은 CASCADE로 삭제 (목록 전체를 재계산하지 않음)
+    - 연결(memory_links)은 이웃 목록에서 파생 (sync_links)
+      양쪽 목록 모두에서 유사도 상위 MAX_LINKS_PER_NOTE개 안에 들고
+      임계값 이상인 쌍만 연결로 유지하므로 관련 메모/그래프/재등장이 같은 집합을 봄
+    - 아직 계산되지 않은 목록(이전 버전 데이터)은 백그라운드 작업(refresh_stale)이 처리
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+
+    def capped_neighbors_sql(
+        self,
+        max_links: int = settings.MAX_LINKS_PER_NOTE,
+        ids_sql: str = "CAST(:note_ids AS integer[])"
+    ) -> str:
+        """
+        대상 메모들의 이웃 중 연결 수 제한을 통과한 것만 고르는 SQL (서브쿼리용)
+        양쪽 목록 모두에서 유사도 상위 max_links개 안에 드는 쌍만 남김
+
+        Args:
+            max_links: 메모별 최대 연결 수 (0이면 제한 없음)
+            ids_sql: 대상 메모 ID 배열 SQL 식 (기본: :note_ids 파라미터)
+
+        Returns:
+            note_id, neighbor_id, similarity 열을 반환하는 SQL
+        """
+        if max_links <= 0:
+            return f"""
+                SELECT note_id, neighbor_id, similarity
+                FROM note_neighbors
+                WHERE note_id = ANY({ids_sql})
+            """
+
+        return f"""
+            WITH ranked AS (
+                SELECT
+                    note_id,
+                    neighbor_id,
+                    similarity,
+                    row_number() OVER (
+                        PARTITION BY note_id
+                        ORDER BY similarity DESC, neighbor_id
+                    ) AS rank
+                FROM note_neighbors
+                WHERE note_id = ANY({ids_sql})
+                    OR note_id IN (
+                        SELECT neighbor_id FROM note_neighbors WHERE note_id = ANY({ids_sql})
+                    )
+            )
+            SELECT f.note_id, f.neighbor_id, f.similarity
+            FROM ranked f
+            JOIN ranked b ON b.note_id = f.neighbor_id AND b.neighbor_id = f.note_id
+            WHERE f.note_id = ANY({ids_sql})
+                AND f.rank <= {int(max_links)}
+                AND b.rank <= {int(max_links)}
+        """
+
+    def trim_lists_containing(self, db: Session, note_id: int) -> None:
+        """
+        note_id가 새로 들어간 목록들을 top-k로 잘라냄
+        (새 메모가 기존 메모 목록의 하위 항목을 밀어냄)
+
+        Args:
+            db: 데이터베이스 세션
+            note_id: 새로 추가된 이웃 메모 ID
+        """
+        db.execute(
+            text("""
+                DELETE FROM note_neighbors nn
+                USING (
+                    SELECT
+                        note_id,
+                        neighbor_id,
+                        row_number() OVER (
+                            PARTITION BY note_id
+                            ORDER BY similarity DESC, neighbor_id
+                        ) AS rank
+                    FROM note_neighbors
+                    WHERE note_id IN (
+                        SELECT note_id FROM note_neighbors WHERE neighbor_id = :note_id
+                    )
+                ) ranked
+                WHERE nn.note_id = ranked.note_id
+                    AND nn.neighbor_id = ranked.neighbor_id
+                    AND ranked.rank > :top_k
+            """),
+            {"note_id": note_id, "top_k": self.top_k}
+        )
+
+    def update_entries(self, db: Session, note_id: int) -> List[int]:
+        """
+        note_id가 들어 있는 목록들의 해당 항목 유사도를 새 임베딩 기준으로 갱신
+        (수정 후 호출, 순위 재계산/잘라내기는 add_to_neighbor_lists에서)
+
+        Args:
+            db: 데이터베이스 세션
+            note_id: 임베딩이 바뀐 메모 ID
+
+        Returns:
+            항목이 갱신된 목록의 메모 ID 리스트
+        """
+        result = db.execute(
+            text("""
+                UPDATE note_neighbors nn
+                SET similarity = 1 - (owner.embedding <=> edited.embedding)
+                FROM notes owner, notes edited
+                WHERE nn.neighbor_id = :note_id
+                    AND owner.id = nn.note_id
+                    AND edited.id = nn.neighbor_id
+                RETURNING nn.note_id
+            """),
+            {"note_id": note_id}
+        )
+        return [row.note_id for row in result.fetchall()]
+
+    def lists_containing(self, db: Session, note_id: int) -> List[int]:
+        """note_id가 이웃으로 들어 있는 목록의 메모 ID 리스트 (삭제 전 호출)"""
+        result = db.execute(
+            text("SELECT note_id FROM note_neighbors WHERE neighbor_id = :note_id"),
+            {"note_id": note_id}
+        )
+        return [row.note_id for row in result.fetchall()]
+
+    def rebuild(self, db: Session, note_ids: List[int]) -> List[str]:
+        """
+        메모들의 이웃 목록을 다시 계산 (커밋하지 않음)
+        공간마다 검색 방식(정확 검색/HNSW)을 정해 공간 단위로 처리
+
+        Args:
+            db: 데이터베이스 세션
+            note_ids: 다시 계산할 메모 ID 리스트
+
+        Returns:
+            다시 계산된 메모들의 공간 리스트
+        """
+        if not note_ids:
+            return []
+
+        db.execute(
+            text("DELETE FROM note_neighbors WHERE note_id = ANY(:note_ids)"),
+            {"note_ids": note_ids}
+        )
+
+        result = db.execute(
+            text("""
+                SELECT space, array_agg(id) AS note_ids
+                FROM notes
+                WHERE id = ANY(:note_ids)
+                GROUP BY space
+            """),
+            {"note_ids": note_ids}
+        )
+        groups = result.fetchall()
+
+        for group in groups:
+            space_sql, space_params = build_note_filters(space=group.space)
+            scan = vector_search.candidate_scan(db, space_sql, space_params, self.top_k + 1)
+            db.execute(
+                text(f"""
+                    WITH candidates AS {scan} (
+                        SELECT id, embedding
+                        FROM notes
+                        WHERE space = :space
+                            AND embedding IS NOT NULL
+                    ),
+                    targets AS (
+                        SELECT id, embedding
+                        FROM notes
+                        WHERE id = ANY(:note_ids)
+                            AND embedding IS NOT NULL
+                    ),
+                    inserted AS (
+                        INSERT INTO note_neighbors (note_id, neighbor_id, similarity)
+                        SELECT t.id, nb.id, nb.similarity
+                        FROM targets t
+                        CROSS JOIN LATERAL (
+                            SELECT
+                                c.id,
+                                1 - (c.embedding <=> t.embedding) AS similarity
+                            FROM candidates c
+                            WHERE c.id <> t.id
+                            ORDER BY c.embedding <=> t.embedding
+                            LIMIT :top_k
+                        ) nb
+                    )
+                    UPDATE notes
+                    SET neighbors_updated_at = NOW()
+                    WHERE id = ANY(:note_ids)
+                """),
+                {"space": group.space, "note_ids": group.note_ids, "top_k": self.top_k}
+            )
+
+        return sorted(group.space for group in groups)
+
+    def add_to_neighbor_lists(self, db: Session, note_id: int) -> None:
+        """
+        note_id의 (새로 계산된) 이웃들의 목록에 note_id를 넣고 top-k로 잘라냄
+
+        Args:
+            db: 데이터베이스 세션
+            note_id: 목록이 방금 계산된 메모 ID
+        """
+        db.execute(
+            text("""
+                INSERT INTO note_neighbors (note_id, neighbor_id, similarity)
+                SELECT neighbor_id, note_id, similarity
+                FROM note_neighbors
+                WHERE note_id = :note_id
+                ON CONFLICT (note_id, neighbor_id)
+                DO UPDATE SET similarity = EXCLUDED.similarity
+            """),
+            {"note_id": note_id}
+        )
+        self.trim_lists_containing(db, note_id)
+
+    def sync_links(self, db: Session, note_ids: List[int]) -> List[str]:
+        """
+        목록이 바뀐 메모들 주변의 연결(memory_links)을 이웃 목록에 맞춤 (커밋하지 않음)
+
+        대상은 note_ids와 이들을 이웃으로 가진 목록의 메모
+        - 연결 수 제한(capped_neighbors_sql)과 임계값을 통과한 쌍: 없으면 양방향 추가, 강도 갱신
+        - 통과하지 못한 쌍의 연결: 삭제
+          (상대 메모 목록이 아직 계산되지 않았으면 이전 방식 연결을 그대로 둠)
+
+        Args:
+            db: 데이터베이스 세션
+            note_ids: 이웃 목록이 바뀐 메모 ID 리스트
+
+        Returns:
+            연결이 바뀐 공간 리스트
+        """
+        if not note_ids:
+            return []
+
+        capped_sql = self.capped_neighbors_sql(
+            ids_sql="ARRAY(SELECT id FROM affected)"
+        )
+        result = db.execute(
+            text(f"""
+                WITH affected AS (
+                    SELECT unnest(CAST(:note_ids AS integer[])) AS id
+                    UNION
+                    SELECT note_id FROM note_neighbors WHERE neighbor_id = ANY(:note_ids)
+                ),
+                capped AS (
+                    SELECT note_id, neighbor_id, similarity
+                    FROM ({capped_sql}) nb
+                    WHERE similarity >= :threshold
+                ),
+                pairs AS (
+                    SELECT DISTINCT ON (source_note_id, target_note_id)
+                        source_note_id, target_note_id, similarity
+                    FROM (
+                        SELECT note_id AS source_note_id, neighbor_id AS target_note_id, similarity
+                        FROM capped
+                        UNION ALL
+                        SELECT neighbor_id, note_id, similarity
+                        FROM capped
+                    ) both_directions
+                    ORDER BY source_note_id, target_note_id, similarity DESC
+                ),
+                deleted AS (
+                    DELETE FROM memory_links ml
+                    WHERE (
+                            ml.source_note_id IN (SELECT id FROM affected)
+                            OR ml.target_note_id IN (SELECT id FROM affected)
+                        )
+                        AND NOT EXISTS (
+                            SELECT 1 FROM pairs p
+                            WHERE p.source_note_id = ml.source_note_id
+                                AND p.target_note_id = ml.target_note_id
+                        )
+                        AND NOT EXISTS (
+                            SELECT 1 FROM notes n
+                            WHERE n.id IN (ml.source_note_id, ml.target_note_id)
+                                AND n.neighbors_updated_at IS NULL
+                        )
+                    RETURNING ml.source_note_id
+                ),
+                updated AS (
+                    UPDATE memory_links ml
+                    SET strength = p.similarity
+                    FROM pairs p
+                    WHERE ml.source_note_id = p.source_note_id
+                        AND ml.target_note_id = p.target_note_id
+                        AND ml.strength IS DISTINCT FROM p.similarity
+                    RETURNING ml.source_note_id
+                ),
+                inserted AS (
+                    INSERT INTO memory_links (source_note_id, target_note_id, strength, reason)
+                    SELECT p.source_note_id, p.target_note_id, p.similarity, 'semantic similarity'
+                    FROM pairs p
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM memory_links ml
+                        WHERE ml.source_note_id = p.source_note_id
+                            AND ml.target_note_id = p.target_note_id
+                    )
+                    RETURNING source_note_id
+                )
+                SELECT DISTINCT n.space
+                FROM (
+                    SELECT source_note_id FROM deleted
+                    UNION ALL
+                    SELECT source_note_id FROM updated
+                    UNION ALL
+                    SELECT source_note_id FROM inserted
+                ) changed
+                JOIN notes n ON n.id = changed.source_note_id
+            """),
+            {"note_ids": note_ids, "threshold": settings.SIMILARITY_THRESHOLD}
+        )
+        return sorted(row.space for row in result.fetchall())
+
+    def refresh_stale(self, db: Session, batch_size: int, max_age_seconds: float = 0) -> List[str]:
+        """
+        아직 계산되지 않은(또는 오래된) 이웃 목록을 한 배치 다시 계산하고
+        연결을 목록에 맞춤 (커밋하지 않음)
+
+        Args:
+            db: 데이터베이스 세션
+            batch_size: 한 번에 처리할 메모 수
+            max_age_seconds: 이 시간이 지난 목록도 다시 계산 (0이면 계산되지 않은 목록만)
+
+        Returns:
+            연결이 바뀐 공간 리스트 (목록만 바뀌고 연결이 같으면 포함하지 않음)
+        """
+        stale_sql = "neighbors_updated_at IS NULL"
+        if max_age_seconds > 0:
+            stale_sql += " OR neighbors_updated_at < NOW() - make_interval(secs => :max_age)"
+
+        result = db.execute(
+            text(f"""
+                SELECT id
+                FROM notes
+                WHERE embedding IS NOT NULL
+                    AND ({stale_sql})
+                ORDER BY neighbors_updated_at NULLS FIRST
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            """),
+            {"batch_size": batch_size, "max_age": max_age_seconds}
+        )
+        note_ids = [row.id for row in result.fetchall()]
+
+        self.rebuild(db, note_ids)
+        return self.sync_links(db, note_ids)
+
+
+# 전역 이웃 목록 서비스 인스턴스
+neighbor_service = NeighborService(settings.NEIGHBOR_TOP_K)
@@ -0,0 +1,149 @@
+"""
+요청 프로파일링 서비스
+선택된 요청만 cProfile과 SQL 실행 기록을 남겨 느린 요청의 원인을 찾음
+"""
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional
+import asyncio
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from app.config import settings
+
+# 프로파일링을 요청하는 헤더 (PROFILE_HEADER_ENABLED일 때만 사용)
+PROFILE_HEADER = "X-Profile"
+# 저장된 프로파일 ID를 알려주는 응답 헤더
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# 현재 요청의 SQL 실행 기록 (프로파일링 중이 아니면 None)
+_sql_statements: ContextVar[Optional[List[dict]]] = ContextVar("sql_statements", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _sql_statements.get() is None:
+        return
+    conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statements = _sql_statements.get()
+    started = conn.info.get("profile_started")
+    if statements is None or not started:
+        return
+    statements.append({
+        "statement": statement,
+        "duration_ms": (time.perf_counter() - started.pop()) * 1000,
+        "rowcount": cursor.rowcount,
+        "executemany": executemany,
+        "database": conn.engine.url.render_as_string(hide_password=True)
+    })
+
+
+class RequestProfiler:
+    """
+    요청 프로파일러
+    - 헤더(허용된 경우) 또는 표본 비율로 프로파일링할 요청 선택
+    - 한 번에 한 요청만 프로파일링 (나머지는 그대로 처리)
+    - cProfile 결과(.prof, snakeviz/flameprof 등에서 사용)와 SQL 기록(.sql.json) 저장
+    - 헤더 허용도 표본 비율도 없으면(기본) 미들웨어 자체를 등록하지 않음
+    - 켜져 있어도 선택되지 않은 요청에는 헤더 확인과 난수 하나 외의 비용이 없음
+    - 결과 파일은 워커 스레드에서 저장
+
+    cProfile은 이벤트 루프 스레드 전체를 기록하므로
+    프로파일링 중 동시에 처리된 다른 요청의 프레임이 섞일 수 있음
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        header_enabled: bool = False,
+        sample_rate: float = 0.0
+    ):
+        self.directory = directory
+        self.header_enabled = header_enabled
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """프로파일링할 수 있는 요청이 있는지 (꺼져 있으면 미들웨어를 등록하지 않음)"""
+        return self.header_enabled or self.sample_rate > 0
+
+    def should_profile(self, request: Request) -> bool:
+        """이 요청을 프로파일링할지 여부"""
+        if self.header_enabled and request.headers.get(PROFILE_HEADER):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def profile(self, request: Request, call_next):
+        """
+        요청을 프로파일링하며 처리
+
+        Args:
+            request: 요청
+            call_next: 다음 미들웨어/엔드포인트
+
+        Returns:
+            X-Profile-Id 헤더가 붙은 응답 (다른 요청을 프로파일링 중이면 그대로 처리)
+        """
+        if not self._lock.acquire(blocking=False):
+            return await call_next(request)
+
+        profile_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        statements: List[dict] = []
+        token = _sql_statements.set(statements)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        status_code = None
+        try:
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            status_code = response.status_code
+            response.headers[PROFILE_ID_HEADER] = profile_id
+            return response
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            _sql_statements.reset(token)
+            try:
+                # 파일 쓰기는 워커 스레드에서 (이벤트 루프를 막지 않음)
+                await asyncio.to_thread(self._save, profile_id, profiler, {
+                    "id": profile_id,
+                    "method": request.method,
+                    "path": request.url.path,
+                    "query": request.url.query,
+                    "status_code": status_code,
+                    "duration_ms": duration_ms,
+                    "sql_total_ms": sum(s["duration_ms"] for s in statements),
+                    "statements": statements
+                })
+            finally:
+                self._lock.release()
+
+    def _save(self, profile_id: str, profiler: cProfile.Profile, summary: dict) -> None:
+        """프로파일과 SQL 기록을 파일로 저장"""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        profiler.dump_stats(base + ".prof")
+        with open(base + ".sql.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+# 전역 요청 프로파일러 인스턴스
+request_profiler = RequestProfiler(
+    settings.PROFILE_DIR,
+    header_enabled=settings.PROFILE_HEADER_ENABLED,
+    sample_rate=settings.PROFILE_SAMPLE_RATE
+)
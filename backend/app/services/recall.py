@@ -4,10 +4,21 @@
 """
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 import math
+from app.config import settings
 from app.services.embedding import embedding_service
+from app.services.filters import build_note_filters
+from app.services.vector_search import vector_search
+from app.models.note import TEXT_SEARCH_CONFIG
+
+# 재등장 모드
+RECALL_MODE_VECTOR = "vector"  # 임베딩 유사도만 사용
+RECALL_MODE_HYBRID = "hybrid"  # 전문 검색 + 임베딩 후보를 순위 융합(RRF)
+
+# Reciprocal Rank Fusion 상수 (순위가 낮은 후보의 영향 완화)
+RRF_K = 60
 
 
 class RecallService:
@@ -22,7 +33,11 @@ class RecallService:
         self, 
         db: Session, 
         query: str, 
-        limit: int = 10
+        limit: int = 10,
+        space: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        mode: str = RECALL_MODE_VECTOR
     ) -> List[Dict]:
         """
         질문에 대한 메모 재등장
@@ -31,6 +46,10 @@ class RecallService:
             db: 데이터베이스 세션
             query: 질문 또는 사고 내용
             limit: 최대 반환 개수
+            space: 대상 메모 공간 (없으면 전체)
+            since: 이 시각 이후 메모만 대상 (없으면 제한 없음)
+            until: 이 시각 이전 메모만 대상 (없으면 제한 없음)
+            mode: "vector" (임베딩만) 또는 "hybrid" (전문 검색 + 임베딩 융합)
             
         Returns:
             맥락 묶음 리스트
@@ -41,41 +60,262 @@ class RecallService:
         # 2. 유사도 + 시간 가중치로 관련 메모 검색
         # 시간 가중치 공식: 1 + log(days_ago + 1) * 0.1
         # 오래된 메모라도 의미가 강하면 노출
-        search_query = text("""
+        # RECALL_CANDIDATE_MULTIPLIER가 0이면 범위 안 모든 메모에 점수를 계산하고,
+        # 0보다 크면 벡터 인덱스로 가까운 limit × 배수개 후보에만 점수를 계산
+        # (빠르지만 후보 밖의 오래된 메모는 시간 가중치로 순위에 오를 수 없음)
+        window_sql, window_params = build_note_filters(
+            space=space, since=since, until=until
+        )
+        params = {
+            "embedding": str(query_embedding),
+            "limit": limit * 2,  # 클러스터링을 위해 더 많이 가져옴
+            **window_params
+        }
+        
+        if mode == RECALL_MODE_HYBRID:
+            params["candidates"] = limit * 4  # 전문 검색/벡터 검색 각각의 후보 수
+            scan = vector_search.candidate_scan(
+                db, window_sql, window_params, params["candidates"]
+            )
+            search_query = self._hybrid_search_query(window_sql, scan)
+            params.update({
+                "query": query,
+                "rrf_k": RRF_K
+            })
+        elif settings.RECALL_CANDIDATE_MULTIPLIER > 0:
+            params["candidates"] = limit * settings.RECALL_CANDIDATE_MULTIPLIER
+            scan = vector_search.candidate_scan(
+                db, window_sql, window_params, params["candidates"]
+            )
+            search_query = text(f"""
+                WITH candidates AS {scan} (
+                    SELECT id, content, created_at, embedding
+                    FROM notes
+                    WHERE embedding IS NOT NULL{window_sql}
+                ),
+                nearest AS (
+                    SELECT 
+                        id,
+                        content,
+                        created_at,
+                        embedding <=> CAST(:embedding AS vector) AS distance
+                    FROM candidates
+                    ORDER BY embedding <=> CAST(:embedding AS vector)
+                    LIMIT :candidates
+                )
+                SELECT 
+                    id,
+                    content,
+                    created_at,
+                    (1 - distance) * 
+                    (1 + log(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400 + 1) * 0.1) as relevance_score
+                FROM nearest
+                ORDER BY relevance_score DESC
+                LIMIT :limit
+            """)
+        else:
+            search_query = text(f"""
+                SELECT 
+                    id,
+                    content,
+                    created_at,
+                    (1 - (embedding <=> CAST(:embedding AS vector))) * 
+                    (1 + log(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400 + 1) * 0.1) as relevance_score
+                FROM notes
+                WHERE embedding IS NOT NULL{window_sql}
+                ORDER BY relevance_score DESC
+                LIMIT :limit
+            """)
+        
+        result = db.execute(search_query, params)
+        
+        recalled_notes = []
+        for row in result.fetchall():
+            recalled_notes.append({
+                "id": row.id,
+                "content": row.content,
+                "created_at": row.created_at,
+                "relevance_score": float(row.relevance_score)
+            })
+        
+        # 3. 연결된 메모들을 클러스터로 묶기
+        clusters = await self._cluster_notes(db, recalled_notes, limit)
+        
+        return clusters
+    
+    async def recall_batch(
+        self,
+        db: Session,
+        queries: List[str],
+        limit: int = 10,
+        space: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[List[Dict]]:
+        """
+        여러 질문에 대한 메모 재등장을 한 번에 처리
+        
+        - 모든 질문 임베딩을 한 번의 배치로 생성
+        - 질문 목록을 unnest한 LATERAL 조인으로 질문별 벡터 후보를 한 번에 조회
+        - 질문별로 가까운 limit × RECALL_BATCH_CANDIDATE_MULTIPLIER개 후보에만 점수를 계산
+          (recall의 기본 동작인 전체 점수 계산과 달리 후보 밖의 오래된 메모는 순위에 오르지 않음)
+        - 모든 후보의 연결을 한 번에 조회한 뒤 질문별로 클러스터링
+        
+        Args:
+            db: 데이터베이스 세션
+            queries: 질문 리스트
+            limit: 질문별 최대 반환 개수
+            space: 대상 메모 공간 (없으면 전체)
+            since: 이 시각 이후 메모만 대상 (없으면 제한 없음)
+            until: 이 시각 이전 메모만 대상 (없으면 제한 없음)
+            
+        Returns:
+            질문 순서대로 맥락 묶음 리스트
+        """
+        if not queries:
+            return []
+        
+        # 1. 질문 임베딩 일괄 생성
+        query_embeddings = await embedding_service.get_embeddings_batch(queries)
+        
+        # 2. 질문별 후보를 한 쿼리로 검색 (점수 공식은 recall과 동일)
+        # 질문 임베딩은 MATERIALIZED CTE에서 한 번만 vector로 변환
+        window_sql, window_params = build_note_filters(
+            space=space, since=since, until=until
+        )
+        candidates = limit * settings.RECALL_BATCH_CANDIDATE_MULTIPLIER
+        scan = vector_search.candidate_scan(db, window_sql, window_params, candidates)
+        search_query = text(f"""
+            WITH q AS MATERIALIZED (
+                SELECT CAST(e AS vector) AS query_embedding, idx
+                FROM unnest(CAST(:embeddings AS text[])) WITH ORDINALITY AS u(e, idx)
+            ),
+            candidates AS {scan} (
+                SELECT id, content, created_at, embedding
+                FROM notes
+                WHERE embedding IS NOT NULL{window_sql}
+            )
             SELECT 
-                id,
-                content,
-                created_at,
-                embedding,
-                (1 - (embedding <=> :embedding)) * 
-                (1 + log(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400 + 1) * 0.1) as relevance_score
-            FROM notes
-            WHERE embedding IS NOT NULL
-            ORDER BY relevance_score DESC
-            LIMIT :limit
+                q.idx,
+                c.id,
+                c.content,
+                c.created_at,
+                c.relevance_score
+            FROM q
+            CROSS JOIN LATERAL (
+                SELECT 
+                    id,
+                    content,
+                    created_at,
+                    (1 - distance) * 
+                    (1 + log(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400 + 1) * 0.1) as relevance_score
+                FROM (
+                    SELECT 
+                        id,
+                        content,
+                        created_at,
+                        embedding <=> q.query_embedding AS distance
+                    FROM candidates
+                    ORDER BY embedding <=> q.query_embedding
+                    LIMIT :candidates
+                ) nearest
+                ORDER BY relevance_score DESC
+                LIMIT :limit
+            ) c
+            ORDER BY q.idx, c.relevance_score DESC
         """)
         
         result = db.execute(
             search_query,
             {
-                "embedding": str(query_embedding),
-                "limit": limit * 2  # 클러스터링을 위해 더 많이 가져옴
+                "embeddings": [str(embedding) for embedding in query_embeddings],
+                "limit": limit * 2,  # 클러스터링을 위해 더 많이 가져옴
+                "candidates": candidates,  # 점수를 다시 계산할 벡터 검색 후보 수
+                **window_params
             }
         )
         
-        recalled_notes = []
+        recalled_by_query = [[] for _ in queries]
         for row in result.fetchall():
-            recalled_notes.append({
+            recalled_by_query[row.idx - 1].append({
                 "id": row.id,
                 "content": row.content,
                 "created_at": row.created_at,
                 "relevance_score": float(row.relevance_score)
             })
         
-        # 3. 연결된 메모들을 클러스터로 묶기
-        clusters = await self._cluster_notes(db, recalled_notes, limit)
+        # 3. 전체 후보의 연결을 한 번에 조회 후 질문별 클러스터링
+        all_note_ids = list({
+            note["id"] for notes in recalled_by_query for note in notes
+        })
+        if not all_note_ids:
+            return [[] for _ in queries]
         
-        return clusters
+        graph = self._load_link_graph(db, all_note_ids)
+        
+        return [
+            self._group_clusters(notes, graph, limit)
+            for notes in recalled_by_query
+        ]
+    
+    def _hybrid_search_query(self, window_sql: str, scan: str):
+        """
+        하이브리드 검색 쿼리 생성
+        
+        - 전문 검색(GIN 인덱스)과 벡터 검색(HNSW 인덱스 또는 정확 검색) 후보를 한 쿼리에서 조회
+        - 두 순위를 Reciprocal Rank Fusion으로 합산해 정렬
+        - 유사도 + 시간 가중치 점수는 융합된 후보에만 계산
+        
+        Args:
+            window_sql: 공간/기간 조건 SQL 조각
+            scan: 벡터 후보 검색 방식 (vector_search.candidate_scan 결과)
+            
+        Returns:
+            실행할 SQL
+        """
+        return text(f"""
+            WITH lexical AS (
+                SELECT 
+                    id,
+                    row_number() OVER (ORDER BY ts_rank_cd(content_tsv, tsq) DESC) AS rank
+                FROM notes, plainto_tsquery('{TEXT_SEARCH_CONFIG}', :query) AS tsq
+                WHERE content_tsv @@ tsq{window_sql}
+                ORDER BY rank
+                LIMIT :candidates
+            ),
+            dense_candidates AS {scan} (
+                SELECT id, embedding
+                FROM notes
+                WHERE embedding IS NOT NULL{window_sql}
+            ),
+            dense AS (
+                SELECT 
+                    id,
+                    row_number() OVER (ORDER BY embedding <=> CAST(:embedding AS vector)) AS rank
+                FROM dense_candidates
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :candidates
+            ),
+            fused AS (
+                SELECT id, SUM(1.0 / (:rrf_k + rank)) AS fused_score
+                FROM (
+                    SELECT id, rank FROM lexical
+                    UNION ALL
+                    SELECT id, rank FROM dense
+                ) ranked
+                GROUP BY id
+            )
+            SELECT 
+                n.id,
+                n.content,
+                n.created_at,
+                COALESCE(1 - (n.embedding <=> CAST(:embedding AS vector)), 0) * 
+                (1 + log(EXTRACT(EPOCH FROM (NOW() - n.created_at)) / 86400 + 1) * 0.1) as relevance_score
+            FROM fused f
+            JOIN notes n ON n.id = f.id
+            ORDER BY f.fused_score DESC
+            LIMIT :limit
+        """)
     
     async def _cluster_notes(
         self, 
@@ -101,6 +341,21 @@ class RecallService:
         note_ids = [note["id"] for note in notes]
         
         # 메모 간 연결 정보 조회
+        graph = self._load_link_graph(db, note_ids)
+        
+        return self._group_clusters(notes, graph, max_notes)
+    
+    def _load_link_graph(self, db: Session, note_ids: List[int]) -> Dict[int, List[int]]:
+        """
+        메모들 사이의 강한 연결(0.75 이상)로 인접 리스트 구성
+        
+        Args:
+            db: 데이터베이스 세션
+            note_ids: 메모 ID 리스트
+            
+        Returns:
+            메모 ID -> 연결된 메모 ID 리스트
+        """
         links_query = text("""
             SELECT source_note_id, target_note_id, strength
             FROM memory_links
@@ -117,6 +372,27 @@ class RecallService:
         for link in links:
             graph[link.source_note_id].append(link.target_note_id)
         
+        return graph
+    
+    def _group_clusters(
+        self,
+        notes: List[Dict],
+        graph: Dict[int, List[int]],
+        max_notes: int
+    ) -> List[Dict]:
+        """
+        연결 그래프를 따라 메모들을 맥락 묶음으로 그룹핑
+        
+        Args:
+            notes: 재등장한 메모 리스트 (관련성 순)
+            graph: 메모 간 인접 리스트 (notes 밖의 메모가 있어도 무시)
+            max_notes: 최대 메모 개수
+            
+        Returns:
+            클러스터 리스트
+        """
+        note_ids = {note["id"] for note in notes}
+        
         # 연결된 메모들을 그룹핑 (간단한 BFS 기반 클러스터링)
         visited = set()
         clusters = []
@@ -146,7 +422,7 @@ class RecallService:
                 # 연결된 메모 탐색 (깊이 1까지만)
                 if len(cluster_notes) < 5:  # 클러스터 크기 제한
                     for connected_id in graph.get(current_id, []):
-                        if connected_id not in cluster_visited:
+                        if connected_id not in cluster_visited and connected_id in note_ids:
                             queue.append(connected_id)
             
             if cluster_notes:
@@ -0,0 +1,421 @@
+"""
+스냅샷 서비스
+메모/임베딩/연결을 열 단위 바이너리 파일로 내보내고 COPY로 다시 적재
+
+파일 형식 (모든 정수는 little-endian):
+    헤더: MAGIC(8바이트) + 형식 버전(uint32) + 임베딩 차원(uint32)
+    청크: 종류(1바이트) + 행 수(uint32) + 열 개수(uint32)
+          + 열마다 [바이트 길이(uint64) + 열 데이터]
+    끝: 종류 CHUNK_END 청크 (행 수 0, 열 0)
+
+열 데이터:
+    정수/시각 열: int64 배열 (시각은 UTC epoch 마이크로초, NULL은 NULL_TIMESTAMP)
+    실수 열: float64 배열
+    문자열 열: NULL 마스크(uint8 × n) + 끝 오프셋(uint64 × n) + UTF-8 바이트
+    임베딩 열: 존재 마스크(uint8 × n) + float32 블록(n × 차원, 없는 행은 0)
+"""
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import struct
+import numpy as np
+from pgvector.psycopg import register_vector
+from app.models.note import Note
+from app.models.memory_link import MemoryLink
+from app.models.note_neighbor import NoteNeighbor
+from app.config import settings
+from app.database import SessionLocal
+from app.services.change_tracking import change_versions
+
+MAGIC = b"MEMSNAP\x00"
+FORMAT_VERSION = 1
+
+CHUNK_NOTES = b"N"
+CHUNK_LINKS = b"L"
+CHUNK_NEIGHBORS = b"B"
+CHUNK_END = b"E"
+
+NULL_TIMESTAMP = np.iinfo(np.int64).min
+
+# 청크 종류별 열 이름과 형식 (int: int64, float: float64, time: 시각, str: 문자열, vector: 임베딩)
+CHUNK_COLUMNS: Dict[bytes, List[Tuple[str, str]]] = {
+    CHUNK_NOTES: [
+        ("id", "int"),
+        ("space", "str"),
+        ("content", "str"),
+        ("content_hash", "str"),
+        ("idempotency_key", "str"),
+        ("created_at", "time"),
+        ("neighbors_updated_at", "time"),
+        ("embedding", "vector"),
+    ],
+    CHUNK_LINKS: [
+        ("source_note_id", "int"),
+        ("target_note_id", "int"),
+        ("strength", "float"),
+        ("reason", "str"),
+        ("created_at", "time"),
+    ],
+    CHUNK_NEIGHBORS: [
+        ("note_id", "int"),
+        ("neighbor_id", "int"),
+        ("similarity", "float"),
+    ],
+}
+
+# COPY 대상 테이블과 열의 PostgreSQL 타입 (binary COPY에 필요)
+COPY_TARGETS: Dict[bytes, Tuple[str, List[str]]] = {
+    CHUNK_NOTES: (
+        "notes",
+        ["int4", "varchar", "text", "varchar", "varchar", "timestamptz", "timestamptz", "vector"],
+    ),
+    CHUNK_LINKS: (
+        "memory_links",
+        ["int4", "int4", "float8", "text", "timestamptz"],
+    ),
+    CHUNK_NEIGHBORS: (
+        "note_neighbors",
+        ["int4", "int4", "float8"],
+    ),
+}
+
+# 가져오기 중 지웠다가 다시 만들 notes 인덱스 (이름, 생성 문장)
+DEFERRED_INDEXES_SQL = """
+    SELECT indexname, indexdef
+    FROM pg_indexes
+    WHERE schemaname = current_schema()
+        AND tablename = 'notes'
+        AND (indexdef LIKE '% USING hnsw %' OR indexdef LIKE '% USING gin %')
+"""
+
+_HEADER = struct.Struct("<8sII")
+_CHUNK_HEADER = struct.Struct("<cII")
+_LENGTH = struct.Struct("<Q")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class SnapshotError(Exception):
+    """스냅샷 파일 형식 오류"""
+
+
+def _encode_times(values: List[Optional[datetime]]) -> bytes:
+    micros = [
+        NULL_TIMESTAMP if value is None
+        else (value - _EPOCH) // _MICROSECOND
+        for value in values
+    ]
+    return np.asarray(micros, dtype="<i8").tobytes()
+
+
+def _decode_times(data: bytes) -> List[Optional[datetime]]:
+    return [
+        None if micros == NULL_TIMESTAMP
+        else _EPOCH + timedelta(microseconds=int(micros))
+        for micros in np.frombuffer(data, dtype="<i8")
+    ]
+
+
+def _encode_strings(values: List[Optional[str]]) -> bytes:
+    encoded = [b"" if value is None else value.encode("utf-8") for value in values]
+    mask = np.asarray([value is None for value in values], dtype=np.uint8)
+    ends = np.cumsum([len(item) for item in encoded], dtype=np.uint64)
+    return mask.tobytes() + ends.astype("<u8").tobytes() + b"".join(encoded)
+
+
+def _decode_strings(data: bytes, count: int) -> List[Optional[str]]:
+    mask = np.frombuffer(data, dtype=np.uint8, count=count)
+    ends = np.frombuffer(data, dtype="<u8", count=count, offset=count)
+    blob = memoryview(data)[count + 8 * count:]
+    values = []
+    start = 0
+    for is_null, end in zip(mask, ends):
+        end = int(end)
+        values.append(None if is_null else bytes(blob[start:end]).decode("utf-8"))
+        start = end
+    return values
+
+
+def _encode_vectors(values: list, dimension: int) -> bytes:
+    mask = np.asarray([value is not None for value in values], dtype=np.uint8)
+    block = np.zeros((len(values), dimension), dtype="<f4")
+    for i, value in enumerate(values):
+        if value is not None:
+            block[i] = value
+    return mask.tobytes() + block.tobytes()
+
+
+def _decode_vectors(data: bytes, count: int, dimension: int) -> List[Optional[np.ndarray]]:
+    mask = np.frombuffer(data, dtype=np.uint8, count=count)
+    block = np.frombuffer(data, dtype="<f4", offset=count).reshape(count, dimension)
+    return [block[i] if present else None for i, present in enumerate(mask)]
+
+
+class SnapshotWriter:
+    """스냅샷 파일 쓰기 (청크 단위로 바로 기록, 전체를 메모리에 올리지 않음)"""
+
+    def __init__(self, stream: BinaryIO, dimension: int):
+        self.stream = stream
+        self.dimension = dimension
+        self.stream.write(_HEADER.pack(MAGIC, FORMAT_VERSION, dimension))
+
+    def write_chunk(self, kind: bytes, rows: list) -> None:
+        """
+        행 리스트를 열 단위로 변환해 청크 하나로 기록
+
+        Args:
+            kind: 청크 종류 (CHUNK_NOTES / CHUNK_LINKS / CHUNK_NEIGHBORS)
+            rows: CHUNK_COLUMNS 순서의 값을 가진 행 리스트
+        """
+        if not rows:
+            return
+
+        columns = CHUNK_COLUMNS[kind]
+        self.stream.write(_CHUNK_HEADER.pack(kind, len(rows), len(columns)))
+        for i, (_, column_type) in enumerate(columns):
+            values = [row[i] for row in rows]
+            if column_type == "int":
+                data = np.asarray(values, dtype="<i8").tobytes()
+            elif column_type == "float":
+                data = np.asarray(values, dtype="<f8").tobytes()
+            elif column_type == "time":
+                data = _encode_times(values)
+            elif column_type == "str":
+                data = _encode_strings(values)
+            else:
+                data = _encode_vectors(values, self.dimension)
+            self.stream.write(_LENGTH.pack(len(data)))
+            self.stream.write(data)
+
+    def close(self) -> None:
+        """끝 청크 기록"""
+        self.stream.write(_CHUNK_HEADER.pack(CHUNK_END, 0, 0))
+
+
+def read_snapshot(
+    stream: BinaryIO,
+    expected_dimension: Optional[int] = None
+) -> Iterator[Tuple[bytes, Dict[str, list]]]:
+    """
+    스냅샷 파일을 청크 단위로 읽는 제너레이터
+
+    Args:
+        stream: 바이너리 읽기 스트림
+        expected_dimension: 기대하는 임베딩 차원 (다르면 오류)
+
+    Yields:
+        (청크 종류, 열 이름 -> 값 리스트)
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise SnapshotError("스냅샷 헤더가 잘렸습니다")
+    magic, version, dimension = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise SnapshotError("스냅샷 파일이 아닙니다")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"지원하지 않는 스냅샷 형식 버전입니다: {version}")
+    if expected_dimension is not None and dimension != expected_dimension:
+        raise SnapshotError(
+            f"임베딩 차원이 다릅니다 (스냅샷 {dimension}, 설정 {expected_dimension})"
+        )
+
+    while True:
+        chunk_header = stream.read(_CHUNK_HEADER.size)
+        if len(chunk_header) != _CHUNK_HEADER.size:
+            raise SnapshotError("끝 청크 없이 파일이 끝났습니다")
+        kind, count, column_count = _CHUNK_HEADER.unpack(chunk_header)
+        if kind == CHUNK_END:
+            return
+        if kind not in CHUNK_COLUMNS or column_count != len(CHUNK_COLUMNS[kind]):
+            raise SnapshotError(f"알 수 없는 청크입니다: {kind!r}")
+
+        chunk = {}
+        for name, column_type in CHUNK_COLUMNS[kind]:
+            (length,) = _LENGTH.unpack(stream.read(_LENGTH.size))
+            data = stream.read(length)
+            if len(data) != length:
+                raise SnapshotError("청크 데이터가 잘렸습니다")
+            if column_type == "int":
+                chunk[name] = np.frombuffer(data, dtype="<i8").tolist()
+            elif column_type == "float":
+                chunk[name] = np.frombuffer(data, dtype="<f8").tolist()
+            elif column_type == "time":
+                chunk[name] = _decode_times(data)
+            elif column_type == "str":
+                chunk[name] = _decode_strings(data, count)
+            else:
+                chunk[name] = _decode_vectors(data, count, dimension)
+        yield kind, chunk
+
+
+def iter_snapshot_embeddings(
+    path: str,
+    expected_dimension: Optional[int] = None
+) -> Iterator[Tuple[List[Optional[str]], List[Optional[np.ndarray]]]]:
+    """
+    스냅샷의 메모 원문과 임베딩만 청크 단위로 읽기 (캐시/인메모리 인덱스 예열용)
+
+    Args:
+        path: 스냅샷 파일 경로
+        expected_dimension: 기대하는 임베딩 차원 (다르면 오류)
+
+    Yields:
+        (원문 리스트, 임베딩 리스트)
+    """
+    with open(path, "rb") as stream:
+        for kind, chunk in read_snapshot(stream, expected_dimension):
+            if kind == CHUNK_NOTES:
+                yield chunk["content"], chunk["embedding"]
+
+
+class SnapshotService:
+    """
+    스냅샷 내보내기/가져오기 서비스
+    - 내보내기: 서버 측 커서로 chunk_size 행씩 읽어 바로 기록
+    - 가져오기: binary COPY로 적재, 큰 인덱스(공간별 부분 인덱스 포함)는 적재 후 한 번에 생성
+    """
+
+    def __init__(self, dimension: int, chunk_size: int = 10000):
+        self.dimension = dimension
+        self.chunk_size = chunk_size
+
+    def _stream_rows(self, conn, statement) -> Iterator[list]:
+        """서버 측 커서로 chunk_size 행씩 읽기"""
+        result = conn.execution_options(
+            stream_results=True, yield_per=self.chunk_size
+        ).execute(statement)
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+    def export(self, engine: Engine, stream: BinaryIO, spaces: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        메모/연결/이웃 목록을 스냅샷으로 내보내기
+
+        Args:
+            engine: 데이터베이스 엔진
+            stream: 바이너리 쓰기 스트림
+            spaces: 내보낼 메모 공간 (없으면 전체)
+
+        Returns:
+            테이블별 내보낸 행 수
+        """
+        notes = Note.__table__
+        links = MemoryLink.__table__
+        neighbors = NoteNeighbor.__table__
+
+        note_filter = notes.c.space.in_(spaces) if spaces else None
+        note_ids = select(notes.c.id)
+        if note_filter is not None:
+            note_ids = note_ids.where(note_filter)
+
+        statements = {
+            CHUNK_NOTES: select(*[notes.c[name] for name, _ in CHUNK_COLUMNS[CHUNK_NOTES]]),
+            CHUNK_LINKS: select(*[links.c[name] for name, _ in CHUNK_COLUMNS[CHUNK_LINKS]]),
+            CHUNK_NEIGHBORS: select(*[neighbors.c[name] for name, _ in CHUNK_COLUMNS[CHUNK_NEIGHBORS]]),
+        }
+        if spaces:
+            statements[CHUNK_NOTES] = statements[CHUNK_NOTES].where(note_filter)
+            statements[CHUNK_LINKS] = statements[CHUNK_LINKS].where(links.c.source_note_id.in_(note_ids))
+            statements[CHUNK_NEIGHBORS] = statements[CHUNK_NEIGHBORS].where(neighbors.c.note_id.in_(note_ids))
+
+        writer = SnapshotWriter(stream, self.dimension)
+        counts = {}
+        # 한 트랜잭션(REPEATABLE READ)에서 읽어 세 테이블이 같은 시점을 보도록 함
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            for kind, statement in statements.items():
+                table = COPY_TARGETS[kind][0]
+                counts[table] = 0
+                for rows in self._stream_rows(conn, statement):
+                    writer.write_chunk(kind, rows)
+                    counts[table] += len(rows)
+        writer.close()
+
+        return counts
+
+    def import_(self, engine: Engine, stream: BinaryIO, replace: bool = False) -> Dict[str, int]:
+        """
+        스냅샷을 binary COPY로 가져오기 (한 트랜잭션)
+        notes의 HNSW/GIN 인덱스(공간별 부분 인덱스 포함)는 적재 전에 지우고 커밋 후 다시 생성
+
+        Args:
+            engine: 데이터베이스 엔진
+            stream: 바이너리 읽기 스트림
+            replace: 기존 메모/연결을 모두 지우고 가져올지 여부
+
+        Returns:
+            테이블별 가져온 행 수
+        """
+        raw = engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            register_vector(conn)
+            counts = {table: 0 for table, _ in COPY_TARGETS.values()}
+            spaces = set()
+
+            with conn.cursor() as cursor:
+                if replace:
+                    cursor.execute("TRUNCATE notes, memory_links, note_neighbors RESTART IDENTITY")
+                else:
+                    cursor.execute("SELECT EXISTS (SELECT 1 FROM notes)")
+                    if cursor.fetchone()[0]:
+                        raise SnapshotError("notes 테이블이 비어 있지 않습니다 (--replace로 덮어쓰기)")
+
+                # 적재 중 행마다 갱신하면 느린 인덱스는 지웠다가 적재 후 한 번에 생성
+                # (전체 HNSW/GIN 인덱스와 init_db.py --space로 만든 공간별 HNSW 인덱스)
+                cursor.execute(DEFERRED_INDEXES_SQL)
+                deferred_indexes = cursor.fetchall()
+                for index_name, _ in deferred_indexes:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+                for kind, chunk in read_snapshot(stream, self.dimension):
+                    table, types = COPY_TARGETS[kind]
+                    names = [name for name, _ in CHUNK_COLUMNS[kind]]
+                    with cursor.copy(
+                        f"COPY {table} ({', '.join(names)}) FROM STDIN WITH (FORMAT BINARY)"
+                    ) as copy:
+                        copy.set_types(types)
+                        for row in zip(*(chunk[name] for name in names)):
+                            copy.write_row(row)
+                    counts[table] += len(chunk[names[0]])
+                    if kind == CHUNK_NOTES:
+                        spaces.update(chunk["space"])
+
+                # 가져온 ID 다음부터 새 ID가 발급되도록 시퀀스 조정
+                for table in ("notes", "memory_links"):
+                    cursor.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}"
+                    )
+
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+
+        raw = engine.raw_connection()
+        try:
+            with raw.driver_connection.cursor() as cursor:
+                for _, index_definition in deferred_indexes:
+                    cursor.execute(index_definition)
+            raw.commit()
+        finally:
+            raw.close()
+
+        # 실행 중인 서버의 조회 캐시(ETag)가 가져온 데이터를 반영하도록 공간 버전 증가
+        db = SessionLocal(bind=engine)
+        try:
+            for space in sorted(spaces):
+                change_versions.bump(db, space)
+            db.commit()
+        finally:
+            db.close()
+
+        return counts
+
+
+# 전역 스냅샷 서비스 인스턴스
+snapshot_service = SnapshotService(settings.EMBEDDING_DIMENSION)
@@ -0,0 +1,123 @@
+"""
+벡터 검색 방식 결정 서비스
+조건(공간/기간)이 붙은 벡터 검색이 HNSW 후보 부족으로 결과가 모자라지 않게 함
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Dict, Tuple
+import threading
+import time
+from app.config import settings
+
+# 후보 CTE 키워드
+EXACT_SCAN = "MATERIALIZED"  # 조건으로 범위를 먼저 읽고 정확한 거리로 정렬
+INDEX_SCAN = "NOT MATERIALIZED"  # HNSW 인덱스로 근사 검색
+
+# pgvector가 허용하는 hnsw.ef_search 최댓값
+MAX_EF_SEARCH = 1000
+
+
+class VectorSearchService:
+    """
+    벡터 검색 방식 결정
+    - HNSW 인덱스는 ef_search개 후보를 뽑은 뒤 WHERE 조건을 적용하므로
+      조건에 맞는 행이 드물면 LIMIT보다 적은 결과가 반환됨
+    - 조건에 맞는 행이 exact_max_rows 미만이면 btree 인덱스로 그 행만 읽어
+      정확한 거리로 정렬 (후보 CTE를 MATERIALIZED로 두어 HNSW를 쓰지 않음)
+    - 그 이상이면 HNSW를 쓰되 현재 트랜잭션의 ef_search를 올려 후보를 넉넉히 가져옴
+      (공간별 부분 인덱스가 선택되도록 준비된 문장도 매번 파라미터 값으로 계획)
+
+    행 수 확인 비용
+    - 공간의 임베딩 수가 exact_max_rows 미만인지는 공간(DB)별로 count_ttl_seconds 동안 재사용
+    - 기간(since/until)이 붙고 공간이 큰 경우에만 기간 안의 행 수를 셈
+    - 두 확인 모두 (space, created_at) WHERE embedding IS NOT NULL 부분 인덱스만 읽음
+
+    호출 측 쿼리는 후보 CTE를 다음 형태로 작성:
+        WITH candidates AS {scan} (SELECT ... FROM notes WHERE embedding IS NOT NULL{filter_sql})
+        SELECT ... FROM candidates ORDER BY embedding <=> :embedding LIMIT :limit
+    """
+
+    def __init__(self, exact_max_rows: int, ef_search: int, count_ttl_seconds: float):
+        self.exact_max_rows = exact_max_rows
+        self.ef_search = ef_search
+        self.count_ttl_seconds = count_ttl_seconds
+        self._small_spaces: Dict[Tuple[str, str], Tuple[bool, float]] = {}  # (space, DB) -> (작은 공간 여부, 확인 시각)
+        self._lock = threading.Lock()
+
+    def _count_below_limit(self, db: Session, filter_sql: str, params: Dict) -> bool:
+        """조건에 맞는 임베딩 수가 exact_max_rows 미만인지 (그 이상은 세지 않음)"""
+        matching = db.execute(
+            text(f"""
+                SELECT count(*) FROM (
+                    SELECT 1 FROM notes
+                    WHERE embedding IS NOT NULL{filter_sql}
+                    LIMIT :exact_max_rows
+                ) matching
+            """),
+            {**params, "exact_max_rows": self.exact_max_rows}
+        ).scalar()
+        return matching < self.exact_max_rows
+
+    def _space_is_small(self, db: Session, space: str) -> bool:
+        """공간의 임베딩 수가 exact_max_rows 미만인지 (TTL 동안 캐시)"""
+        key = (space, str(db.get_bind().url))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._small_spaces.get(key)
+        if cached and now - cached[1] < self.count_ttl_seconds:
+            return cached[0]
+
+        small = self._count_below_limit(db, " AND space = :space", {"space": space})
+        with self._lock:
+            self._small_spaces[key] = (small, now)
+        return small
+
+    def candidate_scan(
+        self,
+        db: Session,
+        filter_sql: str,
+        params: Dict,
+        limit: int
+    ) -> str:
+        """
+        후보 CTE 검색 방식 결정 (INDEX_SCAN이면 이 트랜잭션의 ef_search 조정)
+
+        Args:
+            db: 데이터베이스 세션
+            filter_sql: build_note_filters로 만든 조건 SQL 조각 (별칭 없음)
+            params: 조건 바인딩 파라미터
+            limit: 가져올 결과 수
+
+        Returns:
+            EXACT_SCAN 또는 INDEX_SCAN
+        """
+        if filter_sql:
+            space = params.get("space")
+            # 작은 공간은 기간과 관계없이 정확 검색 (기간은 범위를 더 좁히기만 함)
+            if space is not None and self._space_is_small(db, space):
+                return EXACT_SCAN
+            # 기간이 범위를 좁힐 때만 기간 안의 행 수를 셈
+            windowed = params.get("since") is not None or params.get("until") is not None
+            if windowed and self._count_below_limit(db, filter_sql, params):
+                return EXACT_SCAN
+
+        # 일반(generic) 계획은 공간 값을 모르므로 전체 HNSW 인덱스를 고름
+        # (init_db.py --space로 만든 부분 인덱스를 쓰려면 값이 반영된 계획 필요)
+        ef_search = min(max(self.ef_search, limit), MAX_EF_SEARCH)
+        db.execute(
+            text("""
+                SELECT
+                    set_config('hnsw.ef_search', :ef_search, true),
+                    set_config('plan_cache_mode', 'force_custom_plan', true)
+            """),
+            {"ef_search": str(ef_search)}
+        )
+        return INDEX_SCAN
+
+
+# 전역 벡터 검색 서비스 인스턴스
+vector_search = VectorSearchService(
+    settings.VECTOR_EXACT_SCAN_MAX_ROWS,
+    settings.VECTOR_SEARCH_EF_SEARCH,
+    settings.VECTOR_SPACE_COUNT_TTL_SECONDS
+)
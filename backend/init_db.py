@@ -1,12 +1,39 @@
 """
 데이터베이스 초기화 스크립트
 pgvector 확장 및 테이블 생성
+
+사용법:
+    python init_db.py                  # 확장/테이블/인덱스 생성
+    python init_db.py --space team-a   # 특정 공간 전용 벡터 인덱스 생성
 """
+import argparse
+import hashlib
+import re
 from app.database import engine, Base
-from app.models.note import Note
+from app.models.note import Note, TEXT_SEARCH_CONFIG
 from app.models.memory_link import MemoryLink
+from app.models.change_version import ChangeVersion
+from app.models.note_neighbor import NoteNeighbor
+from app.api.deps import SPACE_PATTERN
+from app.config import settings
 from sqlalchemy import text
 
+# 이미 배포된 테이블에 나중에 추가된 컬럼과 값 채우기 (create_all은 기존 테이블을 변경하지 않음)
+SCHEMA_UPGRADES = [
+    f"ALTER TABLE notes ADD COLUMN IF NOT EXISTS space VARCHAR(64) NOT NULL DEFAULT '{settings.DEFAULT_SPACE}'",
+    f"ALTER TABLE notes ADD COLUMN IF NOT EXISTS content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', content)) STORED",
+    "ALTER TABLE notes ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE notes ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(128)",
+    "ALTER TABLE notes ADD COLUMN IF NOT EXISTS neighbors_updated_at TIMESTAMP WITH TIME ZONE",
+    # 예전 created_at 단일 인덱스는 (space, created_at) 인덱스로 대체됨
+    "DROP INDEX IF EXISTS ix_notes_created_at",
+    # compute_content_hash와 같은 값 (UTF-8 SHA-256 hex)
+    "UPDATE notes SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex') WHERE content_hash IS NULL",
+]
+
+# 공간 전용 벡터 인덱스 이름 접두사
+SPACE_INDEX_PREFIX = "ix_notes_embedding_hnsw_"
+
 
 def init_db():
     """데이터베이스 초기화"""
@@ -22,8 +49,70 @@ def init_db():
     Base.metadata.create_all(bind=engine)
     print("✓ 테이블 생성 완료")
     
+    # 기존 테이블 컬럼 보강
+    with engine.connect() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
+        conn.commit()
+    print("✓ 스키마 업그레이드 완료")
+    
+    # 기존 테이블에 나중에 추가된 인덱스 생성 (이미 있으면 건너뜀)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    print("✓ 인덱스 생성 완료")
+    
     print("데이터베이스 초기화 완료!")
 
 
+def space_index_name(space: str) -> str:
+    """
+    공간 전용 벡터 인덱스 이름
+    (대소문자/'-'·'_'만 다른 공간이 같은 이름이 되지 않도록 원래 이름의 해시를 붙이고,
+    PostgreSQL 이름 길이 제한 63자 안에 들어가도록 앞부분만 사용)
+    """
+    digest = hashlib.sha1(space.encode("utf-8")).hexdigest()[:12]
+    slug = space.replace("-", "_").lower()[:20]
+    return f"{SPACE_INDEX_PREFIX}{slug}_{digest}"
+
+
+def create_space_index(space: str):
+    """
+    특정 메모 공간 전용 벡터 인덱스 생성
+
+    공간 조건이 붙은 부분(partial) HNSW 인덱스를 만들어
+    해당 공간의 연결/재등장 검색이 그 공간의 벡터만 탐색하게 함
+    (큰 공간의 대량 입력이 다른 공간의 검색 인덱스에 영향을 주지 않음)
+
+    Args:
+        space: 메모 공간 이름
+    """
+    if not re.match(SPACE_PATTERN, space):
+        raise ValueError(f"잘못된 공간 이름입니다: {space}")
+
+    index_name = space_index_name(space)
+
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서 실행해야 함
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+            ON notes USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+            WHERE space = '{space}'
+        """))
+    print(f"✓ 공간 '{space}' 벡터 인덱스 생성 완료 ({index_name})")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="데이터베이스 초기화")
+    parser.add_argument(
+        "--space",
+        action="append",
+        default=[],
+        help="전용 벡터 인덱스를 만들 메모 공간 (여러 번 지정 가능)"
+    )
+    args = parser.parse_args()
+
     init_db()
+    for space_name in args.space:
+        create_space_index(space_name)
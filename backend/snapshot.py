@@ -0,0 +1,70 @@
+"""
+스냅샷 내보내기/가져오기 스크립트
+메모, 임베딩, 연결, 이웃 목록을 열 단위 바이너리 파일로 백업/복원
+(임베딩을 다시 계산하지 않고 binary COPY로 적재)
+
+사용법:
+    python snapshot.py export backup.snap                  # 전체 내보내기
+    python snapshot.py export team-a.snap --space team-a   # 특정 공간만 내보내기
+    python snapshot.py import backup.snap                  # 빈 DB로 가져오기
+    python snapshot.py import backup.snap --replace        # 기존 메모를 지우고 가져오기
+"""
+import argparse
+import time
+from app.database import engine
+from app.services.snapshot import snapshot_service
+
+
+def export_snapshot(path: str, spaces: list):
+    """스냅샷 파일로 내보내기"""
+    print(f"스냅샷 내보내기 시작: {path}")
+    started = time.monotonic()
+
+    with open(path, "wb") as stream:
+        counts = snapshot_service.export(engine, stream, spaces or None)
+
+    for table, count in counts.items():
+        print(f"✓ {table}: {count}행")
+    print(f"스냅샷 내보내기 완료! ({time.monotonic() - started:.1f}초)")
+
+
+def import_snapshot(path: str, replace: bool):
+    """스냅샷 파일에서 가져오기 (init_db.py로 테이블을 먼저 만들어야 함)"""
+    print(f"스냅샷 가져오기 시작: {path}")
+    started = time.monotonic()
+
+    with open(path, "rb") as stream:
+        counts = snapshot_service.import_(engine, stream, replace=replace)
+
+    for table, count in counts.items():
+        print(f"✓ {table}: {count}행")
+    print(f"스냅샷 가져오기 완료! ({time.monotonic() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스냅샷 내보내기/가져오기")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="스냅샷 파일로 내보내기")
+    export_parser.add_argument("path", help="스냅샷 파일 경로")
+    export_parser.add_argument(
+        "--space",
+        action="append",
+        default=[],
+        help="내보낼 메모 공간 (여러 번 지정 가능, 없으면 전체)"
+    )
+
+    import_parser = commands.add_parser("import", help="스냅샷 파일에서 가져오기")
+    import_parser.add_argument("path", help="스냅샷 파일 경로")
+    import_parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="기존 메모/연결/이웃 목록을 모두 지우고 가져오기"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(args.path, args.space)
+    else:
+        import_snapshot(args.path, args.replace)
@@ -0,0 +1,144 @@
+"""
+임베딩 수용 제어 테스트 (동시 실행 수, 우선순위별 대기열, 대기 시간 초과)
+"""
+import asyncio
+import pytest
+from app.services.admission import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    AdmissionController,
+    AdmissionRejected,
+)
+
+
+def _controller(max_concurrency=1, interactive_queue=2, bulk_queue=1, max_wait_seconds=1.0):
+    return AdmissionController(
+        max_concurrency=max_concurrency,
+        max_queue={
+            PRIORITY_INTERACTIVE: interactive_queue,
+            PRIORITY_BULK: bulk_queue,
+        },
+        max_wait_seconds=max_wait_seconds,
+        retry_after_seconds=3
+    )
+
+
+async def _hold(controller, priority, started, release, order, name):
+    async with controller.slot(priority):
+        order.append(name)
+        started.set()
+        await release.wait()
+
+
+def test_capacity_counts_running_and_every_queue():
+    assert _controller(max_concurrency=2, interactive_queue=16, bulk_queue=8).capacity == 26
+
+
+def test_admits_up_to_concurrency_without_queueing():
+    async def scenario():
+        controller = _controller(max_concurrency=2)
+        async with controller.slot():
+            async with controller.slot(PRIORITY_BULK):
+                stats = controller.stats()
+                assert stats["active"] == 2
+                assert stats["queued"] == {"interactive": 0, "bulk": 0}
+        stats = controller.stats()
+        assert stats["active"] == 0
+        assert stats["admitted"] == {"interactive": 1, "bulk": 1}
+
+    asyncio.run(scenario())
+
+
+def test_full_bulk_queue_rejects_bulk_but_not_interactive():
+    async def scenario():
+        controller = _controller(bulk_queue=1)
+        release = asyncio.Event()
+        started = asyncio.Event()
+        order = []
+        running = asyncio.create_task(
+            _hold(controller, PRIORITY_BULK, started, release, order, "running")
+        )
+        await started.wait()
+
+        queued_bulk = asyncio.create_task(
+            _hold(controller, PRIORITY_BULK, asyncio.Event(), release, order, "bulk")
+        )
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.slot(PRIORITY_BULK):
+                pass
+        assert rejected.value.status_code == 429
+        assert rejected.value.retry_after == 3
+
+        queued_interactive = asyncio.create_task(
+            _hold(controller, PRIORITY_INTERACTIVE, asyncio.Event(), release, order, "interactive")
+        )
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == {"interactive": 1, "bulk": 1}
+
+        release.set()
+        await asyncio.gather(running, queued_bulk, queued_interactive)
+
+        # 빈 자리는 먼저 기다린 쓰기 요청보다 대화형 요청에 먼저 돌아감
+        assert order == ["running", "interactive", "bulk"]
+        stats = controller.stats()
+        assert stats["active"] == 0
+        assert stats["queued"] == {"interactive": 0, "bulk": 0}
+        assert stats["rejected"]["queue_full"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_wait_timeout_rejects_with_503_and_frees_queue_place():
+    async def scenario():
+        controller = _controller(max_wait_seconds=0.01)
+        release = asyncio.Event()
+        started = asyncio.Event()
+        running = asyncio.create_task(
+            _hold(controller, PRIORITY_INTERACTIVE, started, release, [], "running")
+        )
+        await started.wait()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.slot():
+                pass
+        assert rejected.value.status_code == 503
+        assert controller.stats()["queued"]["interactive"] == 0
+        assert controller.stats()["rejected"]["timeout"] == 1
+
+        release.set()
+        await running
+        assert controller.stats()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        controller = _controller()
+        release = asyncio.Event()
+        started = asyncio.Event()
+        running = asyncio.create_task(
+            _hold(controller, PRIORITY_INTERACTIVE, started, release, [], "running")
+        )
+        await started.wait()
+
+        waiting = asyncio.create_task(
+            _hold(controller, PRIORITY_INTERACTIVE, asyncio.Event(), release, [], "waiting")
+        )
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller.stats()["queued"]["interactive"] == 0
+
+        release.set()
+        await running
+        assert controller.stats()["active"] == 0
+
+        # 반납 후 새 요청은 바로 들어감
+        async with controller.slot():
+            assert controller.stats()["active"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,150 @@
+"""
+스냅샷 파일 형식 테스트 (DB 없이 SnapshotWriter/read_snapshot 왕복)
+"""
+import io
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from app.services.snapshot import (
+    CHUNK_LINKS,
+    CHUNK_NEIGHBORS,
+    CHUNK_NOTES,
+    SnapshotError,
+    SnapshotWriter,
+    iter_snapshot_embeddings,
+    read_snapshot,
+)
+
+DIMENSION = 4
+
+NOTE_ROWS = [
+    (1, "default", "첫 메모", "a" * 64, None,
+     datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc), None,
+     [0.1, 0.2, 0.3, 0.4]),
+    (2, "team-a", "", None, "retry-key",
+     datetime(1969, 12, 31, 23, 59, 59, tzinfo=timezone.utc),
+     datetime(2024, 6, 1, tzinfo=timezone.utc),
+     None),
+    (3, "team-a", "emoji 🧠 and\nnewline", "b" * 64, None,
+     datetime(2030, 1, 1, tzinfo=timezone.utc), None,
+     [-1.0, 0.0, 1.0, 0.5]),
+]
+LINK_ROWS = [
+    (1, 3, 0.8125, "semantic similarity", datetime(2024, 1, 3, tzinfo=timezone.utc)),
+    (3, 1, 0.8125, None, datetime(2024, 1, 3, tzinfo=timezone.utc)),
+]
+NEIGHBOR_ROWS = [
+    (1, 3, 0.8125),
+    (3, 1, 0.8125),
+]
+
+
+def _write_snapshot(chunks) -> bytes:
+    stream = io.BytesIO()
+    writer = SnapshotWriter(stream, DIMENSION)
+    for kind, rows in chunks:
+        writer.write_chunk(kind, rows)
+    writer.close()
+    return stream.getvalue()
+
+
+def _columns(rows):
+    return [list(column) for column in zip(*rows)]
+
+
+def test_round_trip_preserves_every_column():
+    data = _write_snapshot([
+        (CHUNK_NOTES, NOTE_ROWS),
+        (CHUNK_LINKS, LINK_ROWS),
+        (CHUNK_NEIGHBORS, NEIGHBOR_ROWS),
+    ])
+
+    chunks = list(read_snapshot(io.BytesIO(data), expected_dimension=DIMENSION))
+
+    assert [kind for kind, _ in chunks] == [CHUNK_NOTES, CHUNK_LINKS, CHUNK_NEIGHBORS]
+
+    notes = chunks[0][1]
+    ids, spaces, contents, hashes, keys, created, updated, embeddings = _columns(NOTE_ROWS)
+    assert notes["id"] == ids
+    assert notes["space"] == spaces
+    assert notes["content"] == contents
+    assert notes["content_hash"] == hashes
+    assert notes["idempotency_key"] == keys
+    assert notes["created_at"] == created
+    assert notes["neighbors_updated_at"] == updated
+    for expected, actual in zip(embeddings, notes["embedding"]):
+        if expected is None:
+            assert actual is None
+        else:
+            assert actual.dtype == np.float32
+            np.testing.assert_array_equal(actual, np.asarray(expected, dtype=np.float32))
+
+    links = chunks[1][1]
+    sources, targets, strengths, reasons, link_created = _columns(LINK_ROWS)
+    assert links["source_note_id"] == sources
+    assert links["target_note_id"] == targets
+    assert links["strength"] == strengths
+    assert links["reason"] == reasons
+    assert links["created_at"] == link_created
+
+    neighbors = chunks[2][1]
+    note_ids, neighbor_ids, similarities = _columns(NEIGHBOR_ROWS)
+    assert neighbors["note_id"] == note_ids
+    assert neighbors["neighbor_id"] == neighbor_ids
+    assert neighbors["similarity"] == similarities
+
+
+def test_rewriting_read_chunks_is_byte_exact():
+    data = _write_snapshot([(CHUNK_NOTES, NOTE_ROWS), (CHUNK_LINKS, LINK_ROWS)])
+
+    chunks = []
+    for kind, chunk in read_snapshot(io.BytesIO(data)):
+        columns = [chunk[name] for name in chunk]
+        chunks.append((kind, list(zip(*columns))))
+
+    assert _write_snapshot(chunks) == data
+
+
+def test_empty_chunks_are_skipped():
+    data = _write_snapshot([(CHUNK_NOTES, []), (CHUNK_LINKS, LINK_ROWS)])
+
+    assert [kind for kind, _ in read_snapshot(io.BytesIO(data))] == [CHUNK_LINKS]
+
+
+def test_dimension_mismatch_is_rejected():
+    data = _write_snapshot([(CHUNK_NOTES, NOTE_ROWS)])
+
+    with pytest.raises(SnapshotError):
+        list(read_snapshot(io.BytesIO(data), expected_dimension=DIMENSION + 1))
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"NOTASNAP" + bytes(8),
+])
+def test_invalid_header_is_rejected(data):
+    with pytest.raises(SnapshotError):
+        list(read_snapshot(io.BytesIO(data)))
+
+
+def test_truncated_file_is_rejected():
+    data = _write_snapshot([(CHUNK_NOTES, NOTE_ROWS)])
+
+    with pytest.raises(SnapshotError):
+        list(read_snapshot(io.BytesIO(data[:-20])))
+
+
+def test_iter_snapshot_embeddings_yields_note_contents(tmp_path):
+    path = tmp_path / "notes.snap"
+    path.write_bytes(_write_snapshot([
+        (CHUNK_LINKS, LINK_ROWS),
+        (CHUNK_NOTES, NOTE_ROWS),
+    ]))
+
+    chunks = list(iter_snapshot_embeddings(str(path), DIMENSION))
+
+    assert len(chunks) == 1
+    contents, embeddings = chunks[0]
+    assert contents == [row[2] for row in NOTE_ROWS]
+    assert embeddings[1] is None
+    np.testing.assert_array_equal(embeddings[2], np.asarray(NOTE_ROWS[2][7], dtype=np.float32))
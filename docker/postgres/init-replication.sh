@@ -0,0 +1,10 @@
+#!/bin/bash
+# 주 DB 첫 초기화 시 읽기 복제본용 복제 계정과 접속 허용 규칙 추가
+# (docker compose의 db 서비스가 /docker-entrypoint-initdb.d에서 실행)
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-EOSQL
+    CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD 'replicator_pass';
+EOSQL
+
+echo "host replication replicator all md5" >> "$PGDATA/pg_hba.conf"
@@ -59,7 +59,14 @@ const MemoryGraph: React.FC = () => {
 
         // D3 Simulation setup
         // 노드와 링크의 깊은 복사본을 생성하여 시뮬레이션에 사용 (D3가 객체를 직접 수정하므로)
-        const nodes: SimulationNode[] = graphData.nodes.map(d => ({ ...d }));
+        // 서버가 계산한 좌표(0 ~ 1)가 있으면 화면 크기에 맞춰 초기 위치로 사용
+        const margin = 40;
+        const nodes: SimulationNode[] = graphData.nodes.map(d => ({
+            ...d,
+            x: d.x !== undefined && d.x !== null ? margin + d.x * (width - margin * 2) : undefined,
+            y: d.y !== undefined && d.y !== null ? margin + d.y * (height - margin * 2) : undefined,
+        }));
+        const hasLayout = graphData.nodes.length > 0 && graphData.nodes.every(d => d.x != null && d.y != null);
         // 링크 초기화 시 source/target은 id(number) 상태이지만, forceLink가 이를 객체 참조로 변환함
         // 타입 호환성을 위해 unknown을 거쳐서 캐스팅
         const links: SimulationLink[] = graphData.edges.map(d => ({ ...d })) as unknown as SimulationLink[];
@@ -73,6 +80,11 @@ const MemoryGraph: React.FC = () => {
             .force('center', d3.forceCenter(width / 2, height / 2))
             .force('collision', d3.forceCollide().radius(30));
 
+        // 이미 배치된 좌표는 가볍게만 보정
+        if (hasLayout) {
+            simulation.alpha(0.1);
+        }
+
         // 엣지 (연결선) 그리기
         const link = g.append('g')
             .selectAll('line')
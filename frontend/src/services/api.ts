@@ -12,6 +12,26 @@ const api = axios.create({
     },
 });
 
+// 읽기 복제본 사용 시 방금 쓴 메모를 바로 볼 수 있도록
+// 쓰기 응답의 마지막 쓰기 시각을 이후 조회 요청에 다시 보냄 (read-your-writes)
+const LAST_WRITE_HEADER = 'X-Last-Write-At';
+let lastWriteAt: string | null = null;
+
+api.interceptors.response.use((response) => {
+    const value = response.headers[LAST_WRITE_HEADER.toLowerCase()];
+    if (value) {
+        lastWriteAt = value;
+    }
+    return response;
+});
+
+api.interceptors.request.use((config) => {
+    if (lastWriteAt) {
+        config.headers.set(LAST_WRITE_HEADER, lastWriteAt);
+    }
+    return config;
+});
+
 // 타입 정의
 export interface Note {
     id: number;
@@ -47,6 +67,8 @@ export interface GraphNode {
     id: number;
     content: string;
     created_at: string;
+    x?: number; // 서버 계산 레이아웃 좌표 (0 ~ 1)
+    y?: number;
 }
 
 export interface GraphEdge {
@@ -78,6 +100,21 @@ export const noteAPI = {
         const response = await api.get<Note>(`/api/notes/${id}`);
         return response.data;
     },
+
+    /**
+     * 메모 수정
+     */
+    update: async (id: number, content: string): Promise<Note> => {
+        const response = await api.put<Note>(`/api/notes/${id}`, { content });
+        return response.data;
+    },
+
+    /**
+     * 메모 삭제
+     */
+    remove: async (id: number): Promise<void> => {
+        await api.delete(`/api/notes/${id}`);
+    },
 };
 
 export const recallAPI = {
@@ -97,8 +134,8 @@ export const graphAPI = {
     /**
      * 그래프 데이터 조회
      */
-    get: async (query?: string, minStrength: number = 0.75): Promise<GraphData> => {
-        const params: any = { min_strength: minStrength };
+    get: async (query?: string, minStrength: number = 0.75, layout: boolean = true): Promise<GraphData> => {
+        const params: any = { min_strength: minStrength, layout };
         if (query) {
             params.query = query;
         }